@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Compare les backends d'extraction HTML -> texte de keyword_bot sur un corpus enregistré.
+
+Usage :
+  # 1. Enregistrer un corpus (une page .html par site)
+  python3 benchmarks/bench_extract.py --save-from python-bot/sites.txt --corpus corpus/
+  # 2. Mesurer
+  python3 benchmarks/bench_extract.py --corpus corpus/ --repeat 3
+  # 3. Passage à l'échelle de l'étage CPU (extraction + recherche) selon --workers
+  python3 benchmarks/bench_extract.py --corpus corpus/ --workers 1,2,4,8 --keywords "contrat,cdd"
+"""
+import argparse
+import hashlib
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "python-bot"))
+
+import keyword_bot  # noqa: E402
+
+
+def save_corpus(sites_file: Path, corpus: Path, timeout: int) -> None:
+    corpus.mkdir(parents=True, exist_ok=True)
+    session = keyword_bot.make_session()
+    for url in keyword_bot.load_list_from_file(sites_file, set()):
+        try:
+            html = keyword_bot.fetch_html(url, timeout=timeout, session=session)
+        except Exception as e:
+            print(f"[WARN] {url}: {e}", file=sys.stderr)
+            continue
+        name = hashlib.sha1(url.encode()).hexdigest()[:16] + ".html"
+        (corpus / name).write_text(html or "", encoding="utf-8")
+        print(f"{name}  {url}")
+
+
+def load_corpus(corpus: Path):
+    pages = [p.read_text(encoding="utf-8", errors="replace") for p in sorted(corpus.glob("*.html"))]
+    if not pages:
+        raise SystemExit(f"Aucune page .html dans {corpus}")
+    return pages
+
+
+def bench(pages, repeat: int) -> None:
+    total_mb = sum(len(p) for p in pages) / 1e6
+    print(f"{len(pages)} pages, {total_mb:.1f} Mo de HTML, {repeat} passe(s)\n")
+    reference = [keyword_bot.EXTRACTORS["bs4"](p) for p in pages]
+    print(f"{'backend':<12}{'total (s)':>10}{'pages/s':>10}{'Mo/s':>8}{'écart mots':>12}")
+    for name, extract in sorted(keyword_bot.EXTRACTORS.items()):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            texts = [extract(p) for p in pages]
+            best = min(best, time.perf_counter() - start)
+        # Écart relatif du nombre de mots par rapport à BeautifulSoup (référence historique)
+        ref_words = sum(len(t.split()) for t in reference) or 1
+        drift = abs(sum(len(t.split()) for t in texts) - ref_words) / ref_words
+        marker = " *" if name == keyword_bot.DEFAULT_EXTRACTOR else ""
+        print(f"{name + marker:<12}{best:>10.3f}{len(pages) / best:>10.1f}{total_mb / best:>8.1f}{drift:>11.1%}")
+    print("\n* backend par défaut")
+
+
+def bench_workers(pages, counts, keywords, repeat: int) -> None:
+    """Débit de l'étage CPU de keyword_bot (pool de processus) pour chaque nombre de workers."""
+    matcher = keyword_bot.KeywordMatcher(keywords)
+    urls = [f"corpus://{i}" for i in range(len(pages))]
+    print(f"\n{'workers':<10}{'total (s)':>10}{'pages/s':>10}{'accél.':>8}")
+    baseline = None
+    for count in counts:
+        with keyword_bot.make_cpu_pool(count, matcher) as pool:
+            # Démarrage des processus (et compilation de l'automate) hors mesure
+            list(pool.map(keyword_bot._analyze_in_worker, urls[:count], pages[:count], [False] * count, [None] * count))
+            best = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                list(pool.map(
+                    keyword_bot._analyze_in_worker, urls, pages, [False] * len(pages), [None] * len(pages),
+                    chunksize=max(1, len(pages) // (count * 4)),
+                ))
+                best = min(best, time.perf_counter() - start)
+        baseline = baseline or best
+        print(f"{count:<10}{best:>10.3f}{len(pages) / best:>10.1f}{baseline / best:>7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des backends d'extraction de keyword_bot.")
+    parser.add_argument("--corpus", required=True, help="Dossier contenant les pages .html")
+    parser.add_argument("--save-from", help="Télécharger d'abord les sites de ce fichier dans le corpus")
+    parser.add_argument("--repeat", type=int, default=3, help="Nombre de passes (on garde la meilleure)")
+    parser.add_argument("--timeout", type=int, default=15, help="Timeout HTTP (s) pour --save-from")
+    parser.add_argument("--workers", help="Nombres de processus à comparer pour l'étage CPU, ex. 1,2,4")
+    parser.add_argument("--keywords", default="contrat,cdd,sport", help="Mots-clés pour --workers")
+    args = parser.parse_args()
+
+    corpus = Path(args.corpus)
+    if args.save_from:
+        save_corpus(Path(args.save_from), corpus, args.timeout)
+    pages = load_corpus(corpus)
+    bench(pages, args.repeat)
+    if args.workers:
+        counts = [int(n) for n in args.workers.split(",") if n.strip()]
+        keywords = [k.strip() for k in args.keywords.split(",") if k.strip()]
+        bench_workers(pages, counts, keywords, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
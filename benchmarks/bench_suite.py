@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+Benchmarks hors ligne et reproductibles des deux composants Python.
+
+Étapes mesurées :
+  fetch      keyword_bot.fetch_text, page par page, contre un serveur HTTP local
+  normalize  keyword_bot.normalize_with_offsets sur le texte extrait (chemin des pages)
+  match      keyword_bot.find_occurrences avec une longue liste de mots-clés
+  pipeline   keyword_bot.iter_scrape de bout en bout (concurrence par défaut)
+  droit      api_scraper.scrape_droitdusport contre les fixtures de fixtures/droitdusport
+             (connexion, recherche, crawl profondeur 1) ; nécessite Chromium pour Playwright
+
+Le corpus est soit un dossier de pages .html (voir bench_extract.py --save-from),
+soit un corpus synthétique généré avec une graine fixe. Le serveur local tourne dans
+un processus à part pour ne pas fausser les mesures.
+
+Usage :
+  python3 benchmarks/bench_suite.py --save-baseline benchmarks/baseline.json
+  python3 benchmarks/bench_suite.py --baseline benchmarks/baseline.json --tolerance 0.2
+  python3 benchmarks/bench_suite.py --corpus corpus/ --keywords-file mots.txt --stages fetch,match
+
+Avec --baseline, le code de sortie vaut 1 si une étape régresse : résultats différents,
+débit (pages/s) inférieur ou p95 supérieur de plus de --tolerance à la référence.
+"""
+import argparse
+import http.server
+import json
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+from string import Template
+from typing import Callable, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "droitdusport"
+sys.path.insert(0, str(ROOT / "python-bot"))
+
+import keyword_bot  # noqa: E402
+
+STAGES = ("fetch", "normalize", "match", "pipeline", "droit")
+
+_VOCABULARY = (
+    "contrat travail sportif durée déterminée fédération ligue club joueur entraîneur "
+    "arbitre transfert indemnité licence dopage sanction disciplinaire commission appel "
+    "tribunal arbitral conciliation agent sportif mandat rémunération convention collective "
+    "équipe professionnelle amateur association statut règlement championnat compétition "
+    "assurance responsabilité blessure médecin préparateur physique formation centre "
+    "mineur mutation litige cour cassation conseil état décision jurisprudence code sport"
+).split()
+
+
+# --- corpus et mots-clés -----------------------------------------------------------
+
+def synthetic_corpus(pages: int, seed: int) -> List[str]:
+    """Pages HTML déterministes : paragraphes, listes, scripts et styles à ignorer."""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(pages):
+        paragraphs = []
+        for _ in range(rng.randint(20, 60)):
+            words = [rng.choice(_VOCABULARY) for _ in range(rng.randint(20, 80))]
+            paragraphs.append(f"<p>{' '.join(words).capitalize()}.</p>")
+        corpus.append(
+            "<!DOCTYPE html><html lang='fr'><head><meta charset='utf-8'>"
+            f"<title>Page {i}</title><style>p {{ margin: 0 }}</style></head><body>"
+            f"<nav><ul>{''.join(f'<li><a href=/p{j}>{rng.choice(_VOCABULARY)}</a></li>' for j in range(15))}</ul></nav>"
+            f"<main>{''.join(paragraphs)}</main>"
+            "<script>window.dataLayer = window.dataLayer || []; dataLayer.push({page: 1});</script>"
+            "</body></html>"
+        )
+    return corpus
+
+
+def synthetic_keywords(count: int, seed: int) -> List[str]:
+    """Expressions de 1 à 3 mots du vocabulaire, dont une partie absente des pages."""
+    rng = random.Random(seed + 1)
+    keywords = set()
+    while len(keywords) < count:
+        phrase = " ".join(rng.choice(_VOCABULARY) for _ in range(rng.randint(1, 3)))
+        if rng.random() < 0.3:
+            phrase += f" {rng.randint(1900, 2030)}"
+        keywords.add(phrase)
+    return sorted(keywords)
+
+
+def load_corpus(corpus: Path) -> List[str]:
+    pages = [p.read_text(encoding="utf-8", errors="replace") for p in sorted(corpus.glob("*.html"))]
+    if not pages:
+        raise SystemExit(f"Aucune page .html dans {corpus}")
+    return pages
+
+
+# --- serveur local (processus séparé) ----------------------------------------------
+
+class _StandInHandler(http.server.BaseHTTPRequestHandler):
+    """Sert le corpus sous /corpus/<n> et une copie minimale de droitdusport.com."""
+
+    corpus_dir: Path = Path(".")
+    latency: float = 0.0
+    results_per_search = 12
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _send(self, status: int, body: str = "", headers: Optional[Dict[str, str]] = None) -> None:
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _template(self, name: str, **values) -> str:
+        return Template((FIXTURES / name).read_text(encoding="utf-8")).substitute(**values)
+
+    def _logged_in(self) -> bool:
+        return "bench_session=1" in (self.headers.get("Cookie") or "")
+
+    def do_GET(self) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+        url = urlparse(self.path)
+        if url.path.startswith("/corpus/"):
+            page = self.corpus_dir / (url.path.rsplit("/", 1)[-1] + ".html")
+            if page.exists():
+                self._send(200, page.read_text(encoding="utf-8"))
+            else:
+                self._send(404)
+        elif url.path == "/":
+            links = "".join(f"<p><a href='/actualite/{i}'>Actualité {i}</a></p>" for i in range(5))
+            account = "<a href='/compte'>Mon compte</a>" if self._logged_in() else self._template("login.html")
+            self._send(200, self._template("home.html", account=account, links=links))
+        elif url.path == "/search":
+            query = (parse_qs(url.query).get("gsh[textQuery]") or [""])[0]
+            results = "".join(
+                self._template(
+                    "result.html",
+                    id=i,
+                    title=f"{query.capitalize()} : décision n° {i}",
+                    summary=f"Résumé de la décision {i} relative à {query}.",
+                )
+                for i in range(self.results_per_search)
+            )
+            self._send(200, self._template("search.html", query=query, results=results))
+        elif url.path.startswith("/actualite/"):
+            article_id = int(url.path.rsplit("/", 1)[-1] or 0)
+            rng = random.Random(article_id)
+            body = "".join(
+                f"<p>{' '.join(rng.choice(_VOCABULARY) for _ in range(60))}.</p>" for _ in range(8)
+            )
+            self._send(200, self._template(
+                "article.html", title=f"Actualité {article_id}", body=body, next=article_id + 1
+            ))
+        elif url.path == "/static/search.svg":
+            self.send_response(200)
+            self.send_header("Content-Type", "image/svg+xml")
+            svg = b"<svg xmlns='http://www.w3.org/2000/svg' width='16' height='16'/>"
+            self.send_header("Content-Length", str(len(svg)))
+            self.end_headers()
+            self.wfile.write(svg)
+        else:
+            self._send(404)
+
+    def do_POST(self) -> None:
+        if urlparse(self.path).path == "/login":
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            self._send(302, "", {"Location": "/", "Set-Cookie": "bench_session=1; Path=/"})
+        else:
+            self._send(404)
+
+
+def _serve(corpus_dir: str, latency: float, ready) -> None:
+    handler = type("Handler", (_StandInHandler,), {"corpus_dir": Path(corpus_dir), "latency": latency})
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    ready.put(server.server_address[1])
+    server.serve_forever()
+
+
+# --- mesures -----------------------------------------------------------------------
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss est en Ko sous Linux, en octets sous macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _report(pages: int, total: float, latencies: List[float], results: int, **extra) -> Dict:
+    return {
+        "pages": pages,
+        "total_s": round(total, 3),
+        "pages_per_s": round(pages / total, 1) if total else None,
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 2) if latencies else None,
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 2) if latencies else None,
+        "peak_rss_mb": _peak_rss_mb(),
+        "results": results,
+        **extra,
+    }
+
+
+def _timed(fn: Callable, items: List, repeat: int) -> tuple:
+    """Meilleure passe sur `repeat` : (durée totale, latences par élément, valeurs)."""
+    best = None
+    for _ in range(max(1, repeat)):
+        latencies, values = [], []
+        started = time.perf_counter()
+        for item in items:
+            t0 = time.perf_counter()
+            values.append(fn(item))
+            latencies.append(time.perf_counter() - t0)
+        total = time.perf_counter() - started
+        if best is None or total < best[0]:
+            best = (total, latencies, values)
+    return best
+
+
+def bench_bot(base_url: str, names: List[str], keywords: List[str], stages: List[str], repeat: int) -> Dict[str, Dict]:
+    urls = [f"{base_url}corpus/{name}" for name in names]
+    reports: Dict[str, Dict] = {}
+    session = keyword_bot.make_session(hosts=1, per_host=keyword_bot.DEFAULT_CONCURRENCY)
+
+    total, latencies, texts = _timed(lambda u: keyword_bot.fetch_text(u, session=session), urls, repeat)
+    if "fetch" in stages:
+        reports["fetch"] = _report(len(urls), total, latencies, sum(len(t.split()) for t in texts))
+
+    if "normalize" in stages:
+        total, latencies, normed = _timed(keyword_bot.normalize_with_offsets, texts, repeat)
+        reports["normalize"] = _report(len(texts), total, latencies, sum(len(n.norm) for n in normed))
+
+    matcher = keyword_bot.KeywordMatcher(keywords)
+    if "match" in stages:
+        def match(pair):
+            keyword_bot.normalized_page.cache_clear()  # mesurer la normalisation à chaque fois
+            return len(keyword_bot.find_occurrences(pair[1], pair[0], matcher))
+
+        total, latencies, counts = _timed(match, list(zip(urls, texts)), repeat)
+        reports["match"] = _report(len(texts), total, latencies, sum(counts), keywords=len(keywords))
+
+    if "pipeline" in stages:
+        best = None
+        for _ in range(max(1, repeat)):
+            started = time.perf_counter()
+            found = sum(len(occs) for _, occs in keyword_bot.iter_scrape(urls, matcher, per_host=keyword_bot.DEFAULT_CONCURRENCY))
+            elapsed = time.perf_counter() - started
+            if best is None or elapsed < best[0]:
+                best = (elapsed, found)
+        reports["pipeline"] = _report(len(urls), best[0], [], best[1], concurrency=keyword_bot.DEFAULT_CONCURRENCY)
+    session.close()
+    return reports
+
+
+def bench_droit(base_url: str, runs: int) -> Dict:
+    """Scrape complet (connexion, recherche, crawl profondeur 1) contre les fixtures."""
+    os.environ["SCRAPER_DROIT_BASE_URL"] = base_url
+    os.environ.setdefault("SCRAPER_PACING", "fast")
+    os.environ.setdefault("SCRAPER_CRAWL_MIN_INTERVAL_MS", "0")
+    os.environ.setdefault("SCRAPER_POOL_SIZE", "1")
+    sys.path.insert(0, str(ROOT / "python-api"))
+    try:
+        import api_scraper
+    except ImportError as e:
+        return {"skipped": f"dépendances de python-api manquantes : {e}"}
+
+    latencies, pages, items = [], 0, 0
+    started = time.perf_counter()
+    try:
+        for _ in range(max(1, runs)):
+            t0 = time.perf_counter()
+            result = api_scraper.scrape_droitdusport(
+                "bench", "bench", [], search_keyword="contrat", max_depth=1, lean={}, pacing="fast"
+            )
+            latencies.append(time.perf_counter() - t0)
+            items = len(result["items"])
+            pages += len(result.get("load_stats", {}).get("pages", []))
+    except Exception as e:
+        return {"skipped": f"navigateur indisponible : {e}"}
+    finally:
+        stats = api_scraper.get_browser_pool(True).stats()
+        api_scraper._close_browser_pools()
+    total = time.perf_counter() - started
+    browser_rss = [r for r in stats.get("rss_mb", []) if r is not None]
+    return _report(
+        pages, total, latencies, items, runs=len(latencies), browser_rss_mb=max(browser_rss) if browser_rss else None
+    )
+
+
+# --- référence ---------------------------------------------------------------------
+
+def compare(reports: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    failures = []
+    for stage, ref in baseline.items():
+        current = reports.get(stage)
+        if current is None or "skipped" in current or "skipped" in ref:
+            continue
+        if current["results"] != ref["results"]:
+            failures.append(f"{stage}: résultats {current['results']} au lieu de {ref['results']}")
+        if ref.get("pages_per_s") and current.get("pages_per_s") is not None:
+            if current["pages_per_s"] < ref["pages_per_s"] * (1 - tolerance):
+                failures.append(f"{stage}: {current['pages_per_s']} pages/s au lieu de {ref['pages_per_s']}")
+        if ref.get("p95_ms") and current.get("p95_ms") is not None:
+            if current["p95_ms"] > ref["p95_ms"] * (1 + tolerance):
+                failures.append(f"{stage}: p95 {current['p95_ms']} ms au lieu de {ref['p95_ms']}")
+    return failures
+
+
+def print_table(reports: Dict[str, Dict]) -> None:
+    print(f"{'étape':<11}{'pages':>7}{'total (s)':>11}{'pages/s':>10}{'p50 (ms)':>10}{'p95 (ms)':>10}{'RSS (Mo)':>10}{'résultats':>11}")
+    def cell(value, precision: int) -> str:
+        return f"{value:>10.{precision}f}" if value is not None else f"{'-':>10}"
+
+    for stage, r in reports.items():
+        if "skipped" in r:
+            print(f"{stage:<11}ignorée : {r['skipped'].splitlines()[0]}")
+            continue
+        print(
+            f"{stage:<11}{r['pages']:>7}{r['total_s']:>11.3f}{cell(r['pages_per_s'], 1)}"
+            f"{cell(r['p50_ms'], 2)}{cell(r['p95_ms'], 2)}{r['peak_rss_mb']:>10.1f}{r['results']:>11}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks hors ligne de keyword_bot et api_scraper.")
+    parser.add_argument("--corpus", help="Dossier de pages .html (défaut : corpus synthétique)")
+    parser.add_argument("--pages", type=int, default=200, help="Taille du corpus synthétique (défaut : 200)")
+    parser.add_argument("--keywords-file", help="Un mot-clé par ligne (défaut : liste synthétique)")
+    parser.add_argument("--keywords", type=int, default=2000, help="Taille de la liste synthétique (défaut : 2000)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"Étapes à mesurer (défaut : {','.join(STAGES)})")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes par étape, on garde la meilleure")
+    parser.add_argument("--droit-runs", type=int, default=3, help="Scrapes droitdusport mesurés")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latence simulée du serveur local")
+    parser.add_argument("--json", help="Écrire le rapport JSON dans ce fichier")
+    parser.add_argument("--save-baseline", help="Enregistrer le rapport comme référence")
+    parser.add_argument("--baseline", help="Comparer à cette référence (code de sortie 1 si régression)")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Écart toléré sur débit et p95 (défaut : 0.2)")
+    args = parser.parse_args()
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"étapes inconnues : {', '.join(sorted(unknown))}")
+
+    if args.corpus:
+        pages = load_corpus(Path(args.corpus))
+    else:
+        pages = synthetic_corpus(args.pages, args.seed)
+    if args.keywords_file:
+        keywords = keyword_bot.load_list_from_file(Path(args.keywords_file), set())
+    else:
+        keywords = synthetic_keywords(args.keywords, args.seed)
+
+    with tempfile.TemporaryDirectory(prefix="bench-corpus-") as tmp:
+        names = []
+        for i, html in enumerate(pages):
+            name = f"{i:05d}"
+            (Path(tmp) / f"{name}.html").write_text(html, encoding="utf-8")
+            names.append(name)
+
+        ready = multiprocessing.Queue()
+        server = multiprocessing.Process(target=_serve, args=(tmp, args.latency_ms / 1000.0, ready), daemon=True)
+        server.start()
+        base_url = f"http://127.0.0.1:{ready.get(timeout=10)}/"
+        try:
+            print(f"{len(pages)} pages, {len(keywords)} mots-clés, serveur local {base_url}\n")
+            reports = bench_bot(base_url, names, keywords, stages, args.repeat)
+            if "droit" in stages:
+                reports["droit"] = bench_droit(base_url, args.droit_runs)
+        finally:
+            server.terminate()
+            server.join()
+
+    print_table(reports)
+    document = {"params": {"pages": len(pages), "keywords": len(keywords), "seed": args.seed}, "stages": reports}
+    if args.json:
+        Path(args.json).write_text(json.dumps(document, ensure_ascii=False, indent=2))
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(document, ensure_ascii=False, indent=2))
+        print(f"\nRéférence écrite dans {args.save_baseline}")
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        if baseline.get("params") != document["params"]:
+            print("\n[WARN] Paramètres différents de la référence ; comparaison indicative", file=sys.stderr)
+        failures = compare(reports, baseline.get("stages", {}), args.tolerance)
+        if failures:
+            print("\nRégressions :")
+            for failure in failures:
+                print(f"  - {failure}")
+            sys.exit(1)
+        print("\nAucune régression par rapport à la référence.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# Contrôle d'admission des scrapes : au plus autant de scrapes que de navigateurs,
+# une courte file d'attente, et un refus immédiat (429) au-delà plutôt qu'une requête
+# bloquée jusqu'au timeout du proxy.
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+
+class Overloaded(RuntimeError):
+    """Tous les navigateurs sont occupés et la file d'attente est pleine."""
+
+    def __init__(self, message: str, retry_after: int = 30):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class Draining(Overloaded):
+    """Le worker s'arrête : plus aucun scrape n'est admis, y compris ceux en attente."""
+
+
+class AdmissionGate:
+    """
+    `capacity` scrapes simultanés (un par navigateur du pool). Au-delà, jusqu'à
+    `max_waiting` requêtes attendent au plus `wait_timeout` secondes qu'un scrape se
+    termine ; les suivantes sont refusées tout de suite. Les jobs (`queue_limit=False`)
+    attendent sans limite : leur file est déjà bornée par le JobManager.
+    """
+
+    def __init__(self, capacity: int = 2, max_waiting: int = 4, wait_timeout: float = 60.0):
+        self.capacity = max(1, capacity)
+        self.max_waiting = max(0, max_waiting)
+        self.wait_timeout = wait_timeout
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiting = 0
+        self._waiting_jobs = 0
+        self._rejected = 0
+        self._draining = False
+
+    @classmethod
+    def from_env(cls) -> "AdmissionGate":
+        return cls(
+            capacity=int(os.environ.get("SCRAPER_POOL_SIZE", "2")),
+            max_waiting=int(os.environ.get("SCRAPER_ADMISSION_QUEUE", "4")),
+            wait_timeout=float(os.environ.get("SCRAPER_ADMISSION_TIMEOUT", "60")),
+        )
+
+    def _reject(self, reason: str) -> Overloaded:
+        self._rejected += 1
+        return Overloaded(f"{reason} ({self.capacity} navigateurs occupés)", retry_after=max(1, int(self.wait_timeout / 2)))
+
+    def drain(self) -> None:
+        """Refuse désormais toute admission et réveille les requêtes en attente."""
+        with self._cond:
+            self._draining = True
+            self._cond.notify_all()
+
+    def _check_draining(self) -> None:
+        if self._draining:
+            self._rejected += 1
+            raise Draining("Worker en cours d'arrêt, réessayez", retry_after=5)
+
+    @contextmanager
+    def admit(self, queue_limit: bool = True) -> Iterator[None]:
+        with self._cond:
+            self._check_draining()
+            if self._active >= self.capacity:
+                if queue_limit and self._waiting >= self.max_waiting:
+                    raise self._reject("File d'attente pleine")
+                counter = "_waiting" if queue_limit else "_waiting_jobs"
+                setattr(self, counter, getattr(self, counter) + 1)
+                deadline = time.monotonic() + self.wait_timeout if queue_limit else None
+                try:
+                    while self._active >= self.capacity:
+                        remaining = None if deadline is None else deadline - time.monotonic()
+                        if remaining is not None and remaining <= 0:
+                            raise self._reject("Aucun navigateur libéré à temps")
+                        self._cond.wait(remaining)
+                        self._check_draining()
+                finally:
+                    setattr(self, counter, getattr(self, counter) - 1)
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify()
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                "capacity": self.capacity,
+                "active": self._active,
+                "available": max(0, self.capacity - self._active),
+                "waiting": self._waiting,
+                "max_waiting": self.max_waiting,
+                "waiting_jobs": self._waiting_jobs,
+                "rejected": self._rejected,
+                "draining": self._draining,
+            }
@@ -1,24 +1,294 @@
 # API Flask pour le scraper Playwright
-# Déployez ce fichier sur votre VPS Ubuntu
+# Déployez ce fichier (et les modules voisins, ex: browser_pool.py) sur votre VPS Ubuntu
+#
+# Production : gunicorn -c gunicorn.conf.py api_scraper:app (voir gunicorn.conf.py).
+# Chaque worker est un processus isolé avec ses propres navigateurs ; `python api_scraper.py`
+# reste le serveur de développement.
+#
+# Admission (voir admission.py) : au plus SCRAPER_POOL_SIZE scrapes par worker, puis
+# SCRAPER_ADMISSION_QUEUE requêtes en attente au plus SCRAPER_ADMISSION_TIMEOUT secondes ;
+# au-delà, 429 avec Retry-After. /health indique la capacité réelle du worker.
+#
+# Les navigateurs sont gardés ouverts entre les requêtes (voir browser_pool.py).
+# Réglages : SCRAPER_POOL_SIZE, SCRAPER_POOL_MAX_USES, SCRAPER_POOL_MAX_RSS_MB,
+# SCRAPER_POOL_LEASE_TIMEOUT.
+#
+# Les sessions connectées sont réutilisées tant qu'elles sont valides (voir session_store.py).
+# Réglages : SCRAPER_SESSION_KEY (chiffrement sur disque), SCRAPER_SESSION_DIR, SCRAPER_SESSION_TTL.
+#
+# Crawl (max_depth > 0) : SCRAPER_CRAWL_CONCURRENCY, SCRAPER_CRAWL_PER_HOST,
+# SCRAPER_CRAWL_MIN_INTERVAL_MS.
+#
+# Mode job : POST /scrape-droit ou /scrape-dalloz avec {"mode": "job"} renvoie 202 et un
+# job_id ; GET /jobs/<id> donne l'état, GET /jobs/<id>/results diffuse les items en
+# NDJSON (ou SSE si Accept: text/event-stream). Réglages : SCRAPER_JOB_WORKERS, SCRAPER_JOB_QUEUE.
+#
+# Mode lean (opt-in) : {"lean": true} ou {"lean": {"third_party": true}} bloque images,
+# polices, médias et traceurs (voir lean.py), attend un sélecteur cible plutôt que
+# networkidle, et ajoute "load_stats" (octets reçus, temps de chargement) à la réponse.
+#
+# Rythme : {"pacing": "stealth" | "normal" | "fast"} et {"adaptive": true} pour ne ralentir
+# qu'après un signal de throttling (voir pacing.py). Défaut : SCRAPER_PACING ("normal").
+# La réponse indique dans "pacing" le temps passé en pauses volontaires et en travail réel.
+#
+# Cache de résultats (voir result_cache.py) : clé = site, mot-clé normalisé, URLs, max_depth.
+# Un résultat en cache (ou partagé avec un scrape en cours) n'est servi qu'à un compte dont
+# la session est valide, sinon après une vraie connexion (401 si elle échoue).
+# {"cache": false} force un nouveau scrape. Réglages : SCRAPER_CACHE_TTL,
+# SCRAPER_CACHE_TTL_DROITDUSPORT, SCRAPER_CACHE_TTL_DALLOZ, SCRAPER_CACHE_SIZE, SCRAPER_CACHE_DB (SQLite).
+#
+# Mesures (voir metrics.py) : {"timings": true} ajoute à la réponse le temps passé dans
+# chaque étape (navigateur, connexion, recherche, navigation, attentes, pauses, extraction) ;
+# GET /metrics expose ces temps en histogrammes Prometheus, avec l'occupation des pools
+# de navigateurs, les compteurs du cache et la file des jobs.
+#
+# Lots de mots-clés : POST /scrape-droit/batch ou /scrape-dalloz/batch avec {"keywords": [...]}
+# ne se connecte qu'une fois pour tous les mots-clés ; les résultats sont groupés par
+# mot-clé ("results"), ceux en échec listés dans "failed". Chaque mot-clé passe par le
+# même cache qu'une requête simple. Au plus SCRAPER_BATCH_MAX_KEYWORDS mots-clés par lot.
+#
+# Taille des réponses (voir payload.py) : le texte des pages est pris dans la zone principale,
+# sans menus ni pieds de page, coupé à SCRAPER_ITEM_MAX_CHARS caractères par item. Une réponse
+# synchrone s'arrête à SCRAPER_RESPONSE_MAX_BYTES octets d'items ("payload" compte les items
+# écartés) ; le cache et les jobs gardent tous les items, et GET /jobs/<id>/items?cursor=...&limit=N
+# pagine ceux d'un job terminé. {"max_item_chars": N, "max_bytes": N} abaisse ces limites pour
+# une requête (pour un job : à chaque page servie). Les réponses JSON sont compressées (gzip,
+# ou br avec le module brotli) selon Accept-Encoding.
+#
+# SCRAPER_DROIT_BASE_URL remplace https://www.droitdusport.com/ (copie locale du site,
+# ex. les fixtures de benchmarks/bench_suite.py).
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
-from typing import List, Dict, Tuple
+from contextlib import nullcontext
+from typing import Callable, List, Dict, Optional, Tuple
+import atexit
+import functools
+import json
 import random
+import threading
 import time
 import os
-from urllib.parse import urlparse, quote_plus
+from urllib.parse import urljoin, urlparse, quote_plus
 
-from playwright.sync_api import sync_playwright
+from admission import AdmissionGate, Draining, Overloaded
+from browser_pool import BrowserPool
+from crawl import CrawlFrontier, HostBudget
+from extraction import extract_results
+from jobs import JobManager, QueueFull
+from lean import LEAN_SITES, LeanLoader
+from metrics import StageTimer, observe_run, render_samples, STAGE_SECONDS, SCRAPE_SECONDS
+from pacing import PACING_PROFILES, Pacer, parse_pacing
+from payload import DEFAULT_ITEM_MAX_CHARS, ResponseBudget, clip_item, compress_response, page_text
+from result_cache import ResultCache, make_key, normalize_keyword
+from session_store import SessionStore
 
 app = Flask(__name__)
 CORS(app)  # Permet les requêtes cross-origin depuis l'app React
 
+DROIT_HOME_URL = os.environ.get("SCRAPER_DROIT_BASE_URL", "https://www.droitdusport.com/")
+DROIT_HOST = (urlparse(DROIT_HOME_URL).hostname or "").lower()
+DALLOZ_CATALOGUE_URL = "https://catalogue-bu.u-bourgogne.fr/discovery/dbsearch?vid=33UB_INST:33UB_INST&lang=fr"
+DROIT_RESULT_SELECTOR = LEAN_SITES["droitdusport"]["result_selector"]
+DALLOZ_RESULT_SELECTOR = LEAN_SITES["dalloz"]["result_selector"]
+
+session_store = SessionStore.from_env()
+
+DEFAULT_PACING = os.environ.get("SCRAPER_PACING", "normal")
+
+result_cache = ResultCache.from_env()
+
+# Crawl : pages chargées en parallèle, et politesse par hôte commune à tous les scrapes
+# du processus (slots de chargement et intervalle entre deux navigations)
+DEFAULT_CRAWL_CONCURRENCY = int(os.environ.get("SCRAPER_CRAWL_CONCURRENCY", "3"))
+crawl_budget = HostBudget(
+    max_concurrent=int(os.environ.get("SCRAPER_CRAWL_PER_HOST", "3")),
+    min_interval=float(os.environ.get("SCRAPER_CRAWL_MIN_INTERVAL_MS", "500")) / 1000.0,
+)
+
+# Mots-clés acceptés dans une requête /batch
+BATCH_MAX_KEYWORDS = int(os.environ.get("SCRAPER_BATCH_MAX_KEYWORDS", "25"))
+
+# Scrapes en tâche de fond ; un worker de plus que de navigateurs ne servirait qu'à attendre
+job_manager = JobManager(
+    workers=int(os.environ.get("SCRAPER_JOB_WORKERS", os.environ.get("SCRAPER_POOL_SIZE", "2"))),
+    max_queued=int(os.environ.get("SCRAPER_JOB_QUEUE", "20")),
+)
+
+# Scrapes simultanés limités au nombre de navigateurs, avec une courte file d'attente
+admission = AdmissionGate.from_env()
+
+# Passe à vrai à l'arrêt du worker : les nouvelles requêtes de scrape sont refusées (503)
+_draining = threading.Event()
+
+# Un pool de navigateurs persistants par mode (headless ou non), créé à la demande
+_browser_pools: Dict[bool, BrowserPool] = {}
+_browser_pools_lock = threading.Lock()
+
+
+def _effective_headless(headless: bool) -> bool:
+    """PLAYWRIGHT_HEADLESS, s'il est défini, l'emporte sur le paramètre."""
+    headless_env = os.environ.get("PLAYWRIGHT_HEADLESS", "").lower()
+    if headless_env in ("false", "0", "no"):
+        return False
+    if headless_env in ("true", "1", "yes"):
+        return True
+    return headless
+
+
+def get_browser_pool(headless: bool = True) -> BrowserPool:
+    with _browser_pools_lock:
+        pool = _browser_pools.get(headless)
+        if pool is None:
+            pool = BrowserPool.from_env(headless=headless)
+            _browser_pools[headless] = pool
+        return pool
+
+
+@atexit.register
+def _close_browser_pools() -> None:
+    with _browser_pools_lock:
+        pools = list(_browser_pools.values())
+        _browser_pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+def begin_draining() -> None:
+    """
+    Début de l'arrêt (SIGTERM, voir gunicorn.conf.py) : /health passe à "draining"
+    et plus aucun scrape n'est admis ; ceux en cours se terminent normalement.
+    """
+    _draining.set()
+    admission.drain()
+
+
+def shutdown() -> None:
+    """Arrêt propre du worker : refuse les nouveaux scrapes et ferme les navigateurs."""
+    begin_draining()
+    _close_browser_pools()
+
+
+@app.after_request
+def _compress(response: Response) -> Response:
+    return compress_response(response, request.accept_encodings)
+
+
+def _refused(exc: Exception) -> Tuple[Response, int]:
+    """Réponse 429 (saturation) ou 503 (worker en cours d'arrêt)."""
+    response = jsonify({"error": str(exc)})
+    if isinstance(exc, Overloaded):
+        response.headers["Retry-After"] = str(exc.retry_after)
+        if not isinstance(exc, Draining):
+            return response, 429
+    return response, 503
+
+
+# État du scrape en cours dans le thread du navigateur (un seul scrape à la fois par slot)
+_run_state = threading.local()
+
+
+def _begin_run(
+    lean: Optional[LeanLoader] = None, pacer: Optional[Pacer] = None, timer: Optional[StageTimer] = None
+) -> None:
+    _run_state.lean = lean
+    _run_state.pacer = pacer
+    _run_state.timer = timer
+
+
+def _span(stage: str):
+    """Chronomètre une étape du scrape en cours (sans effet hors d'un scrape)."""
+    timer = getattr(_run_state, "timer", None)
+    return timer.span(stage) if timer is not None else nullcontext()
+
+
+def _start_run(
+    context,
+    site: str,
+    lean: Optional[Dict],
+    pacing: Optional[str],
+    adaptive: bool,
+    requested_at: Optional[float],
+) -> Tuple[StageTimer, Optional[LeanLoader], Pacer]:
+    """Prépare le contexte d'un scrape : chronomètre, chargement lean, rythme."""
+    timer = StageTimer(started=requested_at)
+    if requested_at is not None:
+        timer.add("browser", time.monotonic() - requested_at)
+    loader = LeanLoader.for_site(site, **lean) if lean is not None else None
+    if loader is not None:
+        loader.attach(context)
+    pacer = Pacer(pacing or DEFAULT_PACING, adaptive=adaptive)
+    context.on("response", pacer.observe_response)
+    _begin_run(lean=loader, pacer=pacer, timer=timer)
+    return timer, loader, pacer
+
+
+def _pacer() -> Pacer:
+    pacer = getattr(_run_state, "pacer", None)
+    if pacer is None:
+        pacer = Pacer(DEFAULT_PACING)
+        _run_state.pacer = pacer
+    return pacer
+
+
+def _lean_options(value) -> Optional[Dict]:
+    """Paramètre "lean" de la requête -> options de LeanLoader (None = mode normal)."""
+    if not value:
+        return None
+    if isinstance(value, dict):
+        return {"block_third_party": bool(value.get("third_party")), "block": bool(value.get("block", True))}
+    return {}
+
+
+def _goto(page, url: str, selector: Optional[str] = None) -> None:
+    lean = getattr(_run_state, "lean", None)
+    with _span("navigation"):
+        if lean is None:
+            page.goto(url, wait_until="networkidle")
+        else:
+            lean.goto(page, url, selector)
+
+
+def _wait_ready(page, selector: Optional[str] = None) -> None:
+    lean = getattr(_run_state, "lean", None)
+    with _span("wait"):
+        if lean is None:
+            page.wait_for_load_state("networkidle")
+        else:
+            lean.wait_ready(page, selector)
+
+
+class _ResultSink(list):
+    """
+    Liste des items d'un scrape qui publie aussi chaque ajout (streaming des jobs).
+    Le texte de chaque item est coupé à SCRAPER_ITEM_MAX_CHARS ; aucun item n'est
+    écarté ici, le budget en octets s'applique quand la réponse est servie.
+    """
+
+    def __init__(self, on_item: Optional[Callable[[Dict], None]] = None):
+        super().__init__()
+        self._on_item = on_item
+
+    def append(self, item: Dict) -> None:
+        item = clip_item(item, DEFAULT_ITEM_MAX_CHARS)
+        super().append(item)
+        if self._on_item is not None:
+            self._on_item(item)
+
+    def extend(self, items) -> None:
+        for item in items:
+            self.append(item)
+
 
 def _human_sleep(min_ms: int = 300, max_ms: int = 1200) -> None:
-    """Pause courte avec une durée aléatoire pour imiter un humain."""
-    delay = random.uniform(min_ms, max_ms) / 1000.0
-    time.sleep(delay)
+    """Pause courte avec une durée aléatoire pour imiter un humain (selon le profil de rythme)."""
+    with _span("sleep"):
+        _pacer().sleep(min_ms, max_ms)
+
+
+def _type_into(locator, text: str) -> None:
+    with _span("typing"):
+        _pacer().type_into(locator, text)
 
 
 def _human_type(page, selector: str, text: str) -> None:
@@ -30,7 +300,7 @@ def _human_type(page, selector: str, text: str) -> None:
         field = loc.first
         field.click()
         _human_sleep()
-        field.type(text, delay=random.randint(60, 140))
+        _type_into(field, text)
         _human_sleep()
     except Exception:
         try:
@@ -42,7 +312,7 @@ def _human_type(page, selector: str, text: str) -> None:
 def _human_scroll(page) -> None:
     """Fait défiler un peu la page comme le ferait un utilisateur."""
     try:
-        steps = random.randint(1, 3)
+        steps = _pacer().scroll_steps()
         for _ in range(steps):
             page.mouse.wheel(0, random.randint(300, 700))
             _human_sleep(200, 600)
@@ -77,9 +347,9 @@ def _use_droit_search(page, term: str) -> None:
         search_input = page.get_by_role("textbox", name="Effectuer une recherche texte")
         search_input.click()
         _human_sleep()
-        search_input.type(term, delay=random.randint(60, 140))
+        _type_into(search_input, term)
         page.get_by_role("button", name="icone recherche").click()
-        page.wait_for_load_state("networkidle")
+        _wait_ready(page, DROIT_RESULT_SELECTOR)
         _human_sleep()
         return
     except Exception:
@@ -97,9 +367,9 @@ def _use_droit_search(page, term: str) -> None:
             if loc.count() > 0 and loc.first.is_visible():
                 loc.first.click()
                 _human_sleep()
-                loc.first.type(term, delay=random.randint(60, 140))
+                _type_into(loc.first, term)
                 loc.first.press("Enter")
-                page.wait_for_load_state("networkidle")
+                _wait_ready(page, DROIT_RESULT_SELECTOR)
                 _human_sleep()
                 return
         except Exception:
@@ -113,128 +383,266 @@ def scrape_droitdusport(
     headless: bool = True,
     max_depth: int = 0,
     search_keyword: str = "",
+    crawl_concurrency: Optional[int] = None,
+    on_item: Optional[Callable[[Dict], None]] = None,
+    lean: Optional[Dict] = None,
+    pacing: Optional[str] = None,
+    adaptive: bool = False,
 ) -> Dict:
     """
     Utilise Playwright pour se connecter à droitdusport.com et scraper le contenu.
+    Avec max_depth > 0, les liens internes sont suivis en BFS, `crawl_concurrency`
+    pages à la fois (SCRAPER_CRAWL_CONCURRENCY par défaut). `on_item` est appelé
+    pour chaque item dès son extraction. `lean` (options de LeanLoader) active le
+    chargement allégé des pages, `pacing` / `adaptive` règlent les pauses "humaines".
+    Le navigateur est emprunté au pool persistant, avec un contexte neuf ; si une
+    session connectée est en cache pour ce compte, elle y est rechargée.
     """
-    results: List[Dict] = []
-
-    with sync_playwright() as p:
-        headless_env = os.environ.get("PLAYWRIGHT_HEADLESS", "").lower()
-        effective_headless = headless
-        if headless_env in ("false", "0", "no"):
-            effective_headless = False
-        elif headless_env in ("true", "1", "yes"):
-            effective_headless = True
-
-        browser = p.chromium.launch(headless=effective_headless)
-        context = browser.new_context()
-        page = context.new_page()
-
-        # Page d'accueil + connexion
-        page.goto("https://www.droitdusport.com/", wait_until="networkidle")
-        _human_sleep()
+    cached = session_store.get("droitdusport", username, password)
+    job = functools.partial(
+        _scrape_droitdusport_in_context,
+        username=username,
+        password=password,
+        urls=urls,
+        max_depth=max_depth,
+        search_keyword=search_keyword,
+        resumed=cached is not None,
+        crawl_concurrency=crawl_concurrency or DEFAULT_CRAWL_CONCURRENCY,
+        on_item=on_item,
+        lean=lean,
+        pacing=pacing,
+        adaptive=adaptive,
+        requested_at=time.monotonic(),
+    )
+    context_options = {"storage_state": cached["state"]} if cached else None
+    return get_browser_pool(_effective_headless(headless)).run(job, context_options=context_options)
+
+
+def _droit_logged_out(page) -> bool:
+    """La page affiche-t-elle encore le lien ou le formulaire de connexion ?"""
+    try:
+        if page.locator("#password").count() > 0 and page.locator("#password").first.is_visible():
+            return True
+        return page.get_by_text("S'identifier", exact=False).count() > 0
+    except Exception:
+        return True
+
+
+def _droit_login(page, username: str, password: str) -> None:
+    _goto(page, DROIT_HOME_URL)
+    _human_sleep()
+    try:
+        page.get_by_text("S'identifier", exact=False).click()
+    except Exception:
+        pass
+
+    _human_type(page, "#username", username)
+    _human_type(page, "#password", password)
+    try:
+        page.get_by_role("button", name="Se connecter").click()
+    except Exception:
         try:
-            page.get_by_text("S'identifier", exact=False).click()
+            page.click("button.btn.btn-dds[type='submit']")
         except Exception:
             pass
 
-        _human_type(page, "#username", username)
-        _human_type(page, "#password", password)
-        try:
-            page.get_by_role("button", name="Se connecter").click()
-        except Exception:
-            try:
-                page.click("button.btn.btn-dds[type='submit']")
-            except Exception:
-                pass
+    _wait_ready(page)
+    _human_sleep()
 
-        page.wait_for_load_state("networkidle")
-        _human_sleep()
 
-        # Recherche par mot-clé
-        targets: List[str] = []
-        if search_keyword:
-            try:
-                _use_droit_search(page, search_keyword)
-            except Exception:
-                encoded = quote_plus(search_keyword)
-                search_url = (
-                    "https://www.droitdusport.com/search?"
-                    f"gsh%5BtextQuery%5D={encoded}&"
-                    "gsh%5BcontentTemplate%5D=last_actualite"
-                )
-                page.goto(search_url, wait_until="networkidle")
-            targets.append(page.url)
-        else:
-            targets.extend(urls)
+def _droit_ensure_login(context, page, username: str, password: str, resumed: bool) -> None:
+    """Session en cache : on vérifie qu'elle est toujours connectée, sinon connexion complète."""
+    logged_in = False
+    if resumed:
+        _goto(page, DROIT_HOME_URL)
+        logged_in = not _droit_logged_out(page)
+        if not logged_in:
+            session_store.invalidate("droitdusport", username)
+            context.clear_cookies()
 
-        visited: set = set()
-        queue: List[Tuple[str, int]] = [(u, 0) for u in targets]
+    if not logged_in:
+        _droit_login(page, username, password)
+        if not _droit_logged_out(page):
+            session_store.put("droitdusport", username, password, context.storage_state())
 
-        while queue:
-            u, depth = queue.pop(0)
-            if u in visited or depth > max_depth:
-                continue
-            visited.add(u)
 
+def login_droitdusport(username: str, password: str, headless: bool = True, pacing: Optional[str] = None) -> bool:
+    """Connexion seule, sans scrape ; True si elle a réussi (session enregistrée pour ce compte)."""
+    def job(context) -> None:
+        _start_run(context, "droitdusport", None, pacing, False, None)
+        with _span("login"):
+            _droit_ensure_login(context, context.new_page(), username, password, resumed=False)
+
+    get_browser_pool(_effective_headless(headless)).run(job)
+    return session_store.get("droitdusport", username, password) is not None
+
+
+def _droit_search_url(keyword: str) -> str:
+    """URL directe de la page de résultats, sans passer par la barre de recherche."""
+    return urljoin(
+        DROIT_HOME_URL,
+        f"search?gsh%5BtextQuery%5D={quote_plus(keyword)}&gsh%5BcontentTemplate%5D=last_actualite",
+    )
+
+
+def _is_droit_url(url: str) -> bool:
+    host = (urlparse(url).hostname or "").lower()
+    return host == DROIT_HOST or host.endswith("droitdusport.com")
+
+
+def _extract_droit_page(page, u: str) -> List[Dict]:
+    with _span("extraction"):
+        return _extract_droit_blocks(page, u)
+
+
+def _extract_droit_blocks(page, u: str) -> List[Dict]:
+    """Blocs .search-result s'il y en a (extraits en un appel), sinon le texte de la page."""
+    try:
+        blocks = extract_results(page, "droitdusport", fallback_url=u)
+    except Exception:
+        blocks = []
+    if blocks:
+        return blocks
+
+    try:
+        return [{"url": u, "text": page_text(page)}]
+    except Exception as exc:
+        return [{"url": u, "error": str(exc), "text": ""}]
+
+
+def _next_wave(frontier: CrawlFrontier, size: int) -> List[Tuple[str, int]]:
+    """Prend jusqu'à `size` pages dans la frontière, sans dépasser le budget par hôte."""
+    wave: List[Tuple[str, int]] = []
+    deferred: List[Tuple[str, int]] = []
+    per_host: Dict[str, int] = {}
+    while frontier and len(wave) < size:
+        u, depth = frontier.pop()
+        host = urlparse(u).hostname or ""
+        if per_host.get(host, 0) >= crawl_budget.max_concurrent:
+            deferred.append((u, depth))
+            continue
+        per_host[host] = per_host.get(host, 0) + 1
+        wave.append((u, depth))
+    frontier.push_front(deferred)
+    return wave
+
+
+def _crawl_droit(context, page, frontier: CrawlFrontier, concurrency: int, results: List[Dict]) -> None:
+    """
+    Parcours BFS par vagues : les navigations d'une vague sont lancées sur plusieurs
+    onglets du même contexte (donc de la même session), puis chaque onglet est
+    attendu et extrait. L'API sync ne permet pas d'attendre en parallèle, mais les
+    pages se chargent simultanément côté navigateur. Chaque chargement occupe un
+    slot de `crawl_budget` jusqu'à ce que la page soit prête. Les items sont ajoutés
+    à `results` au fur et à mesure.
+    """
+    tabs = [page]
+    while frontier:
+        wave = _next_wave(frontier, max(1, concurrency))
+        while len(tabs) < len(wave):
+            tabs.append(context.new_page())
+
+        started: List[Tuple[object, str, int, float]] = []
+        for i, (tab, (u, depth)) in enumerate(zip(tabs, wave)):
+            host = urlparse(u).hostname or ""
+            # On n'attend un slot que si l'on n'en détient aucun ; sinon le reste de la vague est reporté
+            if not crawl_budget.acquire(host, block=not started):
+                frontier.push_front(wave[i:])
+                break
             try:
-                page.goto(u, wait_until="networkidle")
-                _human_sleep()
-                _human_scroll(page)
+                t0 = time.monotonic()
+                with _span("navigation"):
+                    tab.goto(u, wait_until="commit")
+                started.append((tab, u, depth, t0))
             except Exception as exc:
+                crawl_budget.release(host)
                 results.append({"url": u, "error": str(exc), "text": ""})
-                continue
 
+        _human_sleep()
+        lean = getattr(_run_state, "lean", None)
+        for tab, u, depth, t0 in started:
             try:
-                blocks = page.locator(".search-result")
-                count = blocks.count()
-            except Exception:
-                blocks = None
-                count = 0
-
-            if blocks is None or count == 0:
-                try:
-                    text = page.text_content("body") or ""
-                    results.append({"url": u, "text": text})
-                except Exception as exc:
-                    results.append({"url": u, "error": str(exc), "text": ""})
-            else:
-                for i in range(count):
-                    try:
-                        block = blocks.nth(i)
-                        title_loc = block.locator("a").first
-                        title = (title_loc.text_content() or "").strip()
-                        link = title_loc.get_attribute("href") or u
-                        snippet = (block.text_content() or "").strip()
-                        results.append({
-                            "url": link,
-                            "title": title,
-                            "text": snippet,
-                        })
-                    except Exception:
-                        continue
-
-            if depth >= max_depth:
+                _wait_ready(tab)
+            except Exception as exc:
+                results.append({"url": u, "error": str(exc), "text": ""})
+                continue
+            finally:
+                crawl_budget.release(urlparse(u).hostname or "")
+            try:
+                if lean is not None:
+                    lean.record_page(u, t0)
+                _human_scroll(tab)
+            except Exception as exc:
+                results.append({"url": u, "error": str(exc), "text": ""})
                 continue
 
+            results.extend(_extract_droit_page(tab, u))
+
+            if depth >= frontier.max_depth:
+                continue
             try:
-                links = page.locator("a[href]").evaluate_all("els => els.map(e => e.href)")
+                links = tab.locator("a[href]").evaluate_all("els => els.map(e => e.href)")
             except Exception:
                 links = []
-
             for link in links:
-                if not isinstance(link, str):
-                    continue
-                parsed = urlparse(link)
-                host = parsed.hostname or ""
-                if host.endswith("droitdusport.com") and link not in visited:
-                    queue.append((link, depth + 1))
+                frontier.push(link, depth + 1)
+
+    for tab in tabs[1:]:
+        try:
+            tab.close()
+        except Exception:
+            pass
+
+
+def _scrape_droitdusport_in_context(
+    context,
+    username: str,
+    password: str,
+    urls: List[str],
+    max_depth: int,
+    search_keyword: str,
+    resumed: bool = False,
+    crawl_concurrency: int = 1,
+    on_item: Optional[Callable[[Dict], None]] = None,
+    lean: Optional[Dict] = None,
+    pacing: Optional[str] = None,
+    adaptive: bool = False,
+    requested_at: Optional[float] = None,
+) -> Dict:
+    timer, loader, pacer = _start_run(context, "droitdusport", lean, pacing, adaptive, requested_at)
+    results: List[Dict] = _ResultSink(on_item)
+    page = context.new_page()
+
+    with _span("login"):
+        _droit_ensure_login(context, page, username, password, resumed)
+
+    # Recherche par mot-clé
+    targets: List[str] = []
+    if search_keyword:
+        with _span("search"):
+            try:
+                _use_droit_search(page, search_keyword)
+            except Exception:
+                _goto(page, _droit_search_url(search_keyword), DROIT_RESULT_SELECTOR)
+        targets.append(page.url)
+    else:
+        targets.extend(urls)
 
-        context.close()
-        browser.close()
+    frontier = CrawlFrontier(max_depth, accept=_is_droit_url)
+    for u in targets:
+        frontier.seed(u)
+    with _span("crawl"):
+        _crawl_droit(context, page, frontier, crawl_concurrency, results)
 
-    return {"items": results}
+    observe_run("droitdusport", timer)
+    response: Dict = {
+        "items": results,
+        "pacing": pacer.stats(),
+        "timings": timer.to_dict(),
+    }
+    if loader is not None:
+        response["load_stats"] = loader.stats()
+    return response
 
 
 @app.route('/scrape-droit', methods=['POST'])
@@ -247,151 +655,509 @@ def scrape():
     urls = data.get('urls', [])
     keyword = data.get('keyword', '')
     max_depth = data.get('max_depth', 0)
+    concurrency = data.get('concurrency')
+    lean = _lean_options(data.get('lean'))
+    pacing, adaptive = parse_pacing(data.get('pacing'), data.get('adaptive'), DEFAULT_PACING)
     
     if not username or not password:
         return jsonify({"error": "Username and password required"}), 400
+    if _draining.is_set():
+        return _refused(RuntimeError("Worker en cours d'arrêt, réessayez"))
+    if pacing not in PACING_PROFILES:
+        return jsonify({"error": f"Unknown pacing profile: {pacing}"}), 400
+    try:
+        budget = ResponseBudget.from_request(data)
+    except (TypeError, ValueError):
+        return jsonify({"error": "max_item_chars and max_bytes must be integers"}), 400
+
+    job = functools.partial(
+        scrape_droitdusport,
+        username=username,
+        password=password,
+        urls=urls,
+        search_keyword=keyword,
+        max_depth=max_depth,
+        crawl_concurrency=concurrency,
+        lean=lean,
+        pacing=pacing,
+        adaptive=adaptive,
+        headless=True,
+    )
+    key = make_key("droitdusport", keyword, urls, max_depth)
+    refresh = data.get('cache') is False
+    timings = bool(data.get('timings'))
+
+    if data.get('mode') == 'job':
+        params = {"keyword": keyword, "urls": urls, "max_depth": max_depth, **ResponseBudget.limits(data)}
+        return _submit_job(
+            "droitdusport",
+            params,
+            lambda emit: _cached_scrape(
+                "droitdusport", key, job, emit, refresh, timings, wait=True,
+                authorize=_account_check("droitdusport", username, password, pacing, wait=True),
+            ),
+        )
     
     try:
-        result = scrape_droitdusport(
-            username=username,
-            password=password,
-            urls=urls,
-            search_keyword=keyword,
-            max_depth=max_depth,
-            headless=True
+        result = _cached_scrape(
+            "droitdusport", key, job, refresh=refresh, timings=timings, budget=budget or ResponseBudget(),
+            authorize=_account_check("droitdusport", username, password, pacing),
         )
         return jsonify(result)
+    except LoginFailed as e:
+        return jsonify({"error": str(e)}), 401
+    except Overloaded as e:
+        return _refused(e)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+def scrape_droitdusport_batch(
+    username: str,
+    password: str,
+    keywords: List[str],
+    headless: bool = True,
+    concurrency: Optional[int] = None,
+    on_item: Optional[Callable[[Dict], None]] = None,
+    lean: Optional[Dict] = None,
+    pacing: Optional[str] = None,
+    adaptive: bool = False,
+) -> Dict:
+    """
+    Une seule connexion pour plusieurs mots-clés : les pages de résultats sont
+    chargées par leur URL directe, `concurrency` onglets à la fois. Renvoie
+    {"keywords": {mot-clé: {"items", "error"}}, "pacing", "timings"}.
+    """
+    cached = session_store.get("droitdusport", username, password)
+    job = functools.partial(
+        _scrape_droit_batch_in_context,
+        username=username,
+        password=password,
+        keywords=keywords,
+        resumed=cached is not None,
+        concurrency=concurrency or DEFAULT_CRAWL_CONCURRENCY,
+        on_item=on_item,
+        lean=lean,
+        pacing=pacing,
+        adaptive=adaptive,
+        requested_at=time.monotonic(),
+    )
+    context_options = {"storage_state": cached["state"]} if cached else None
+    return get_browser_pool(_effective_headless(headless)).run(job, context_options=context_options)
+
+
+def _keyword_outcome(items: List[Dict], error: Optional[str] = None) -> Dict:
+    """Résultat d'un mot-clé du lot ; en échec si aucun item n'a pu être extrait."""
+    if error is None and items and all(i.get("error") for i in items):
+        error = items[0]["error"]
+    return {"items": items, "error": error}
+
+
+def _keyword_sink(kw: str, on_item: Optional[Callable[[Dict], None]]) -> _ResultSink:
+    """Items d'un mot-clé du lot, publiés avec le mot-clé."""
+    publish = (lambda item: on_item({**item, "keyword": kw})) if on_item is not None else None
+    return _ResultSink(publish)
+
+
+def _search_droit_batch(
+    context,
+    page,
+    keywords: List[str],
+    concurrency: int,
+    on_item: Optional[Callable[[Dict], None]],
+) -> Dict[str, Dict]:
+    """
+    Même principe que _crawl_droit : chaque vague lance jusqu'à `concurrency`
+    recherches sur autant d'onglets de la session, puis attend et extrait chaque
+    onglet. Un mot-clé en échec n'interrompt pas les autres.
+    """
+    outcomes: Dict[str, Dict] = {}
+    lean = getattr(_run_state, "lean", None)
+    tabs = [page]
+    pending = list(keywords)
+    while pending:
+        wave, pending = pending[:max(1, concurrency)], pending[max(1, concurrency):]
+        while len(tabs) < len(wave):
+            tabs.append(context.new_page())
+
+        started: List[Tuple[object, str, str, float]] = []
+        for i, (tab, kw) in enumerate(zip(tabs, wave)):
+            if not crawl_budget.acquire(DROIT_HOST, block=not started):
+                pending = wave[i:] + pending
+                break
+            u = _droit_search_url(kw)
+            try:
+                t0 = time.monotonic()
+                with _span("navigation"):
+                    tab.goto(u, wait_until="commit")
+                started.append((tab, kw, u, t0))
+            except Exception as exc:
+                crawl_budget.release(DROIT_HOST)
+                outcomes[kw] = _keyword_outcome([], str(exc))
+
+        _human_sleep()
+        for tab, kw, u, t0 in started:
+            try:
+                _wait_ready(tab, DROIT_RESULT_SELECTOR)
+            except Exception as exc:
+                outcomes[kw] = _keyword_outcome([], str(exc))
+                continue
+            finally:
+                crawl_budget.release(DROIT_HOST)
+            if lean is not None:
+                lean.record_page(u, t0)
+            items = _keyword_sink(kw, on_item)
+            items.extend(_extract_droit_page(tab, u))
+            outcomes[kw] = _keyword_outcome(list(items))
+
+    for tab in tabs[1:]:
+        try:
+            tab.close()
+        except Exception:
+            pass
+    return outcomes
+
+
+def _scrape_droit_batch_in_context(
+    context,
+    username: str,
+    password: str,
+    keywords: List[str],
+    resumed: bool = False,
+    concurrency: int = 1,
+    on_item: Optional[Callable[[Dict], None]] = None,
+    lean: Optional[Dict] = None,
+    pacing: Optional[str] = None,
+    adaptive: bool = False,
+    requested_at: Optional[float] = None,
+) -> Dict:
+    timer, loader, pacer = _start_run(context, "droitdusport", lean, pacing, adaptive, requested_at)
+    page = context.new_page()
+
+    try:
+        with _span("login"):
+            _droit_ensure_login(context, page, username, password, resumed)
+    except Exception as e:
+        outcomes = {kw: _keyword_outcome([], f"Erreur de connexion: {e}") for kw in keywords}
+    else:
+        with _span("search"):
+            outcomes = _search_droit_batch(context, page, keywords, concurrency, on_item)
+
+    observe_run("droitdusport", timer)
+    response: Dict = {
+        "keywords": outcomes,
+        "pacing": pacer.stats(),
+        "timings": timer.to_dict(),
+    }
+    if loader is not None:
+        response["load_stats"] = loader.stats()
+    return response
+
+
+@app.route('/scrape-droit/batch', methods=['POST'])
+def scrape_droit_batch_endpoint():
+    """Plusieurs mots-clés sur droitdusport avec une seule connexion."""
+    return _batch_endpoint("droitdusport", scrape_droitdusport_batch, request.json or {})
+
+
 def scrape_dalloz(
     username: str,
     password: str,
     search_keyword: str = "",
     headless: bool = True,
+    on_item: Optional[Callable[[Dict], None]] = None,
+    lean: Optional[Dict] = None,
+    pacing: Optional[str] = None,
+    adaptive: bool = False,
 ) -> Dict:
     """
     Utilise Playwright pour se connecter à Dalloz via le portail de l'université de Bourgogne.
+    Le navigateur est emprunté au pool persistant, avec un contexte neuf ; si une
+    session connectée est en cache pour ce compte, on va directement sur Dalloz.
     """
-    results: List[Dict] = []
+    cached = session_store.get("dalloz", username, password)
+    job = functools.partial(
+        _scrape_dalloz_in_context,
+        username=username,
+        password=password,
+        search_keyword=search_keyword,
+        resume_url=(cached["meta"].get("dalloz_url") if cached else None),
+        on_item=on_item,
+        lean=lean,
+        pacing=pacing,
+        adaptive=adaptive,
+        requested_at=time.monotonic(),
+    )
+    context_options = {"storage_state": cached["state"]} if cached else None
+    return get_browser_pool(_effective_headless(headless)).run(job, context_options=context_options)
 
-    with sync_playwright() as p:
-        headless_env = os.environ.get("PLAYWRIGHT_HEADLESS", "").lower()
-        effective_headless = headless
-        if headless_env in ("false", "0", "no"):
-            effective_headless = False
-        elif headless_env in ("true", "1", "yes"):
-            effective_headless = True
 
-        browser = p.chromium.launch(headless=effective_headless)
-        context = browser.new_context()
-        page = context.new_page()
+def _dalloz_logged_out(page) -> bool:
+    """Redirigé hors de Dalloz (portail CAS, catalogue) ou formulaire de connexion visible."""
+    host = (urlparse(page.url).hostname or "").lower()
+    if "dalloz" not in host:
+        return True
+    try:
+        return page.locator("input[type='password']").count() > 0
+    except Exception:
+        return True
 
-        try:
-            # Accès au catalogue de la BU
-            page.goto("https://catalogue-bu.u-bourgogne.fr/discovery/dbsearch?vid=33UB_INST:33UB_INST&lang=fr", wait_until="networkidle")
-            _human_sleep()
-
-            # Clic sur S'inscrire (bouton de connexion)
-            page.get_by_role("button", name="S'inscrire").click()
-            _human_sleep()
-
-            # Connexion universitaire
-            page.locator("#username").fill(username)
-            _human_sleep(200, 400)
-            page.locator("#password").fill(password)
-            _human_sleep(200, 400)
-            page.get_by_role("button", name="CONNEXION").click()
-            page.wait_for_load_state("networkidle")
-            _human_sleep()
-
-            # Recherche de Dalloz dans le catalogue
-            page.get_by_role("combobox", name="Rechercher").click()
-            _human_sleep()
-            page.get_by_role("combobox", name="Rechercher").fill("dalloz")
-            _human_sleep()
-            page.get_by_role("option", name="Dalloz", exact=True).click()
-            _human_sleep()
-            page.get_by_role("link", name="Dalloz", exact=True).click()
-            page.wait_for_load_state("networkidle")
-            _human_sleep()
 
-            # Ouvre Dalloz dans un popup
-            with page.expect_popup() as page1_info:
-                page.get_by_role("link", name="Dalloz - Base de données -").click()
-            dalloz_page = page1_info.value
-            dalloz_page.wait_for_load_state("networkidle")
-            _human_sleep()
+def _dalloz_resume(context, resume_url: str):
+    """Rouvre Dalloz avec la session en cache ; None si elle n'est plus valide."""
+    page = context.new_page()
+    try:
+        _goto(page, resume_url)
+        if not _dalloz_logged_out(page):
+            return page
+    except Exception:
+        pass
+    page.close()
+    return None
 
-            # Si un mot-clé est fourni, effectuer une recherche sur Dalloz
-            if search_keyword:
-                try:
-                    # Cherche le champ de recherche sur Dalloz
-                    search_selectors = [
-                        "input[type='search']",
-                        "input[placeholder*='recherche' i]",
-                        "input[name*='search' i]",
-                        "#search",
-                        ".search-input",
-                    ]
-                    for sel in search_selectors:
-                        try:
-                            loc = dalloz_page.locator(sel)
-                            if loc.count() > 0 and loc.first.is_visible():
-                                loc.first.click()
-                                _human_sleep()
-                                loc.first.type(search_keyword, delay=random.randint(60, 140))
-                                loc.first.press("Enter")
-                                dalloz_page.wait_for_load_state("networkidle")
-                                _human_sleep()
-                                break
-                        except Exception:
-                            continue
-                except Exception as e:
-                    print(f"Erreur recherche Dalloz: {e}")
 
-            # Extraction du contenu
-            try:
-                text = dalloz_page.text_content("body") or ""
-                results.append({
-                    "url": dalloz_page.url,
-                    "title": "Dalloz - Résultats",
-                    "text": text[:50000]  # Limite à 50k caractères
-                })
-            except Exception as e:
-                results.append({
-                    "url": "https://www.dalloz.fr",
-                    "error": str(e),
-                    "text": ""
-                })
+def _dalloz_login(context, username: str, password: str):
+    """Connexion via le catalogue de la BU ; renvoie la page Dalloz ouverte en popup."""
+    page = context.new_page()
+
+    # Accès au catalogue de la BU
+    _goto(page, DALLOZ_CATALOGUE_URL)
+    _human_sleep()
+
+    # Clic sur S'inscrire (bouton de connexion)
+    page.get_by_role("button", name="S'inscrire").click()
+    _human_sleep()
+
+    # Connexion universitaire
+    page.locator("#username").fill(username)
+    _human_sleep(200, 400)
+    page.locator("#password").fill(password)
+    _human_sleep(200, 400)
+    page.get_by_role("button", name="CONNEXION").click()
+    _wait_ready(page)
+    _human_sleep()
+
+    # Recherche de Dalloz dans le catalogue
+    page.get_by_role("combobox", name="Rechercher").click()
+    _human_sleep()
+    page.get_by_role("combobox", name="Rechercher").fill("dalloz")
+    _human_sleep()
+    page.get_by_role("option", name="Dalloz", exact=True).click()
+    _human_sleep()
+    page.get_by_role("link", name="Dalloz", exact=True).click()
+    _wait_ready(page)
+    _human_sleep()
+
+    # Ouvre Dalloz dans un popup
+    with page.expect_popup() as page1_info:
+        page.get_by_role("link", name="Dalloz - Base de données -").click()
+    dalloz_page = page1_info.value
+    _wait_ready(dalloz_page)
+    _human_sleep()
+    return dalloz_page
+
+
+def _dalloz_ensure_login(context, username: str, password: str, resume_url: Optional[str]):
+    """Reprend la session en cache si elle est valide, sinon connexion complète ; renvoie la page Dalloz."""
+    dalloz_page = _dalloz_resume(context, resume_url) if resume_url else None
+    if dalloz_page is None:
+        if resume_url:
+            session_store.invalidate("dalloz", username)
+            context.clear_cookies()
+        dalloz_page = _dalloz_login(context, username, password)
+        if not _dalloz_logged_out(dalloz_page):
+            session_store.put(
+                "dalloz", username, password, context.storage_state(), meta={"dalloz_url": dalloz_page.url}
+            )
+    return dalloz_page
+
+
+def login_dalloz(username: str, password: str, headless: bool = True, pacing: Optional[str] = None) -> bool:
+    """Connexion seule, sans scrape ; True si elle a réussi (session enregistrée pour ce compte)."""
+    def job(context) -> None:
+        _start_run(context, "dalloz", None, pacing, False, None)
+        with _span("login"):
+            _dalloz_ensure_login(context, username, password, None)
+
+    get_browser_pool(_effective_headless(headless)).run(job)
+    return session_store.get("dalloz", username, password) is not None
+
+
+def _dalloz_search(dalloz_page, keyword: str) -> bool:
+    """Lance la recherche dans le premier champ de recherche visible ; False si aucun."""
+    search_selectors = [
+        "input[type='search']",
+        "input[placeholder*='recherche' i]",
+        "input[name*='search' i]",
+        "#search",
+        ".search-input",
+    ]
+    for sel in search_selectors:
+        try:
+            loc = dalloz_page.locator(sel)
+            if loc.count() > 0 and loc.first.is_visible():
+                loc.first.click()
+                _human_sleep()
+                _type_into(loc.first, keyword)
+                loc.first.press("Enter")
+                _wait_ready(dalloz_page, DALLOZ_RESULT_SELECTOR)
+                _human_sleep()
+                return True
+        except Exception:
+            continue
+    return False
 
-            # Extraction des liens de résultats si présents
-            try:
-                result_links = dalloz_page.locator("a[href*='/documentation/']").evaluate_all(
-                    "els => els.slice(0, 10).map(e => ({href: e.href, text: e.textContent}))"
-                )
-                for link_info in result_links:
-                    if isinstance(link_info, dict):
-                        results.append({
-                            "url": link_info.get("href", ""),
-                            "title": (link_info.get("text", "") or "").strip()[:200],
-                            "text": ""
-                        })
-            except Exception:
-                pass
 
+def _extract_dalloz_page(dalloz_page) -> List[Dict]:
+    """Texte de la page (tronqué) puis liens de résultats s'il y en a."""
+    items: List[Dict] = []
+    with _span("extraction"):
+        try:
+            items.append({
+                "url": dalloz_page.url,
+                "title": "Dalloz - Résultats",
+                "text": page_text(dalloz_page),
+            })
         except Exception as e:
-            results.append({
+            items.append({
                 "url": "https://www.dalloz.fr",
-                "error": f"Erreur de connexion: {str(e)}",
+                "error": str(e),
                 "text": ""
             })
 
-        context.close()
-        browser.close()
+        # Extraction des liens de résultats si présents
+        try:
+            items.extend(extract_results(dalloz_page, "dalloz"))
+        except Exception:
+            pass
+    return items
+
 
-    return {"items": results}
+def _scrape_dalloz_in_context(
+    context,
+    username: str,
+    password: str,
+    search_keyword: str,
+    resume_url: Optional[str] = None,
+    on_item: Optional[Callable[[Dict], None]] = None,
+    lean: Optional[Dict] = None,
+    pacing: Optional[str] = None,
+    adaptive: bool = False,
+    requested_at: Optional[float] = None,
+) -> Dict:
+    timer, loader, pacer = _start_run(context, "dalloz", lean, pacing, adaptive, requested_at)
+    results: List[Dict] = _ResultSink(on_item)
+
+    try:
+        with _span("login"):
+            dalloz_page = _dalloz_ensure_login(context, username, password, resume_url)
+
+        # Si un mot-clé est fourni, effectuer une recherche sur Dalloz
+        if search_keyword:
+            with _span("search"):
+                try:
+                    _dalloz_search(dalloz_page, search_keyword)
+                except Exception as e:
+                    print(f"Erreur recherche Dalloz: {e}")
+
+        results.extend(_extract_dalloz_page(dalloz_page))
+
+    except Exception as e:
+        results.append({
+            "url": "https://www.dalloz.fr",
+            "error": f"Erreur de connexion: {str(e)}",
+            "text": ""
+        })
+
+    observe_run("dalloz", timer)
+    response: Dict = {
+        "items": results,
+        "pacing": pacer.stats(),
+        "timings": timer.to_dict(),
+    }
+    if loader is not None:
+        response["load_stats"] = loader.stats()
+    return response
+
+
+def scrape_dalloz_batch(
+    username: str,
+    password: str,
+    keywords: List[str],
+    headless: bool = True,
+    concurrency: Optional[int] = None,
+    on_item: Optional[Callable[[Dict], None]] = None,
+    lean: Optional[Dict] = None,
+    pacing: Optional[str] = None,
+    adaptive: bool = False,
+) -> Dict:
+    """
+    Une seule connexion Dalloz pour plusieurs mots-clés, recherchés l'un après
+    l'autre depuis la page d'accueil (la recherche passe par le formulaire, sans URL
+    directe exploitable) ; `concurrency` est ignoré. Même format que scrape_droitdusport_batch.
+    """
+    cached = session_store.get("dalloz", username, password)
+    job = functools.partial(
+        _scrape_dalloz_batch_in_context,
+        username=username,
+        password=password,
+        keywords=keywords,
+        resume_url=(cached["meta"].get("dalloz_url") if cached else None),
+        on_item=on_item,
+        lean=lean,
+        pacing=pacing,
+        adaptive=adaptive,
+        requested_at=time.monotonic(),
+    )
+    context_options = {"storage_state": cached["state"]} if cached else None
+    return get_browser_pool(_effective_headless(headless)).run(job, context_options=context_options)
+
+
+def _scrape_dalloz_batch_in_context(
+    context,
+    username: str,
+    password: str,
+    keywords: List[str],
+    resume_url: Optional[str] = None,
+    on_item: Optional[Callable[[Dict], None]] = None,
+    lean: Optional[Dict] = None,
+    pacing: Optional[str] = None,
+    adaptive: bool = False,
+    requested_at: Optional[float] = None,
+) -> Dict:
+    timer, loader, pacer = _start_run(context, "dalloz", lean, pacing, adaptive, requested_at)
+    outcomes: Dict[str, Dict] = {}
+
+    try:
+        with _span("login"):
+            dalloz_page = _dalloz_ensure_login(context, username, password, resume_url)
+            home_url = dalloz_page.url
+    except Exception as e:
+        outcomes = {kw: _keyword_outcome([], f"Erreur de connexion: {e}") for kw in keywords}
+    else:
+        for i, kw in enumerate(keywords):
+            try:
+                with _span("search"):
+                    if i > 0:
+                        _goto(dalloz_page, home_url)
+                    if not _dalloz_search(dalloz_page, kw):
+                        raise RuntimeError("Champ de recherche Dalloz introuvable")
+            except Exception as e:
+                outcomes[kw] = _keyword_outcome([], f"Erreur recherche Dalloz: {e}")
+                continue
+            items = _keyword_sink(kw, on_item)
+            items.extend(_extract_dalloz_page(dalloz_page))
+            outcomes[kw] = _keyword_outcome(list(items))
+
+    observe_run("dalloz", timer)
+    response: Dict = {
+        "keywords": outcomes,
+        "pacing": pacer.stats(),
+        "timings": timer.to_dict(),
+    }
+    if loader is not None:
+        response["load_stats"] = loader.stats()
+    return response
 
 
 @app.route('/scrape-dalloz', methods=['POST'])
@@ -402,29 +1168,456 @@ def scrape_dalloz_endpoint():
     username = data.get('username', '')
     password = data.get('password', '')
     keyword = data.get('keyword', '')
+    lean = _lean_options(data.get('lean'))
+    pacing, adaptive = parse_pacing(data.get('pacing'), data.get('adaptive'), DEFAULT_PACING)
     
     if not username or not password:
         return jsonify({"error": "Username and password required"}), 400
+    if _draining.is_set():
+        return _refused(RuntimeError("Worker en cours d'arrêt, réessayez"))
+    if pacing not in PACING_PROFILES:
+        return jsonify({"error": f"Unknown pacing profile: {pacing}"}), 400
+    try:
+        budget = ResponseBudget.from_request(data)
+    except (TypeError, ValueError):
+        return jsonify({"error": "max_item_chars and max_bytes must be integers"}), 400
+
+    job = functools.partial(
+        scrape_dalloz,
+        username=username,
+        password=password,
+        search_keyword=keyword,
+        lean=lean,
+        pacing=pacing,
+        adaptive=adaptive,
+        headless=True,
+    )
+    key = make_key("dalloz", keyword)
+    refresh = data.get('cache') is False
+    timings = bool(data.get('timings'))
+
+    if data.get('mode') == 'job':
+        return _submit_job(
+            "dalloz",
+            {"keyword": keyword, **ResponseBudget.limits(data)},
+            lambda emit: _cached_scrape(
+                "dalloz", key, job, emit, refresh, timings, wait=True,
+                authorize=_account_check("dalloz", username, password, pacing, wait=True),
+            ),
+        )
     
     try:
-        result = scrape_dalloz(
-            username=username,
-            password=password,
-            search_keyword=keyword,
-            headless=True
+        result = _cached_scrape(
+            "dalloz", key, job, refresh=refresh, timings=timings, budget=budget or ResponseBudget(),
+            authorize=_account_check("dalloz", username, password, pacing),
         )
         return jsonify(result)
+    except LoginFailed as e:
+        return jsonify({"error": str(e)}), 401
+    except Overloaded as e:
+        return _refused(e)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+class LoginFailed(Exception):
+    """Identifiants refusés par le site (réponse 401)."""
+
+
+_LOGINS: Dict[str, Callable[..., bool]] = {"droitdusport": login_droitdusport, "dalloz": login_dalloz}
+
+
+def _account_check(
+    site: str, username: str, password: str, pacing: Optional[str], wait: bool = False
+) -> Callable[[], None]:
+    """
+    Contrôle à passer avant de servir un résultat scrapé pour un autre appel : la
+    clé du cache ne contient pas le compte, on exige donc une session valide pour
+    ces identifiants (mot de passe vérifié par session_store), sinon une vraie
+    connexion, admise comme un scrape. LoginFailed si elle échoue.
+    """
+    def check() -> None:
+        if session_store.get(site, username, password) is not None:
+            return
+        with admission.admit(queue_limit=not wait):
+            logged_in = _LOGINS[site](username, password, headless=True, pacing=pacing)
+        if not logged_in:
+            raise LoginFailed(f"Connexion {site} refusée pour ce compte")
+
+    return check
+
+
+def _cached_scrape(
+    site: str,
+    key: str,
+    scrape_fn: Callable,
+    on_item: Optional[Callable[[Dict], None]] = None,
+    refresh: bool = False,
+    timings: bool = False,
+    wait: bool = False,
+    budget: Optional[ResponseBudget] = None,
+    authorize: Optional[Callable[[], None]] = None,
+) -> Dict:
+    """
+    Passe par le cache de résultats : un scrape n'est lancé que si aucun résultat
+    frais n'existe et qu'aucun scrape identique n'est déjà en cours. Un résultat
+    qui n'a pas été scrapé pour cet appel n'est servi qu'après `authorize` (voir
+    _account_check), puis ses items sont tout de même publiés via `on_item`. Le
+    détail des temps par étape n'est renvoyé que si `timings` est demandé (pour un
+    résultat servi depuis le cache, ce sont ceux du scrape d'origine). `budget` borne
+    la taille de la réponse renvoyée ; le cache et les jobs reçoivent tous les items.
+
+    Un vrai scrape passe par le contrôle d'admission : Overloaded si la file est
+    pleine, sauf avec `wait` (jobs) où l'on attend qu'un navigateur se libère.
+    """
+    def compute() -> Dict:
+        with admission.admit(queue_limit=not wait):
+            return scrape_fn(on_item=on_item)
+
+    result, status, age = result_cache.get_or_compute(site, key, compute, refresh=refresh, authorize=authorize)
+    if status != "miss" and on_item is not None:
+        for item in result.get("items", []):
+            on_item(item)
+    response = {**result, "cache": {"status": status, "age_s": round(age, 1)}}
+    if not timings:
+        response.pop("timings", None)
+    if budget is not None:
+        response["items"] = budget.fit(result.get("items", []))
+        response["payload"] = budget.stats()
+    return response
+
+
+@app.route('/scrape-dalloz/batch', methods=['POST'])
+def scrape_dalloz_batch_endpoint():
+    """Plusieurs mots-clés sur Dalloz avec une seule connexion."""
+    return _batch_endpoint("dalloz", scrape_dalloz_batch, request.json or {})
+
+
+def _batch_keywords(value) -> List[str]:
+    """Liste de mots-clés de la requête, sans vides ni doublons (au sens du cache)."""
+    if not isinstance(value, list):
+        raise ValueError("keywords must be a list")
+    keywords: List[str] = []
+    seen = set()
+    for kw in value:
+        if not isinstance(kw, str) or not kw.strip():
+            continue
+        norm = normalize_keyword(kw)
+        if norm not in seen:
+            seen.add(norm)
+            keywords.append(kw.strip())
+    if not keywords:
+        raise ValueError("keywords required")
+    if len(keywords) > BATCH_MAX_KEYWORDS:
+        raise ValueError(f"At most {BATCH_MAX_KEYWORDS} keywords per batch")
+    return keywords
+
+
+def _batch_endpoint(site: str, batch_fn: Callable, data: Dict):
+    username = data.get('username', '')
+    password = data.get('password', '')
+    lean = _lean_options(data.get('lean'))
+    pacing, adaptive = parse_pacing(data.get('pacing'), data.get('adaptive'), DEFAULT_PACING)
+
+    if not username or not password:
+        return jsonify({"error": "Username and password required"}), 400
+    try:
+        keywords = _batch_keywords(data.get('keywords'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if _draining.is_set():
+        return _refused(RuntimeError("Worker en cours d'arrêt, réessayez"))
+    if pacing not in PACING_PROFILES:
+        return jsonify({"error": f"Unknown pacing profile: {pacing}"}), 400
+    try:
+        budget = ResponseBudget.from_request(data)
+    except (TypeError, ValueError):
+        return jsonify({"error": "max_item_chars and max_bytes must be integers"}), 400
+
+    job = functools.partial(
+        batch_fn,
+        username=username,
+        password=password,
+        concurrency=data.get('concurrency'),
+        lean=lean,
+        pacing=pacing,
+        adaptive=adaptive,
+        headless=True,
+    )
+    refresh = data.get('cache') is False
+    timings = bool(data.get('timings'))
+
+    if data.get('mode') == 'job':
+        def run(emit: Callable[[Dict], None]) -> Dict:
+            result = _cached_batch(
+                site, keywords, job, emit, refresh, timings, wait=True,
+                authorize=_account_check(site, username, password, pacing, wait=True),
+            )
+            # Les items sont déjà diffusés : l'état du job ne garde que leur nombre
+            result["results"] = [
+                {**{k: v for k, v in r.items() if k != "items"}, "item_count": len(r["items"])}
+                for r in result["results"]
+            ]
+            return result
+
+        return _submit_job(f"{site}-batch", {"keywords": keywords, **ResponseBudget.limits(data)}, run)
+
+    try:
+        return jsonify(_cached_batch(
+            site, keywords, job, refresh=refresh, timings=timings, budget=budget or ResponseBudget(),
+            authorize=_account_check(site, username, password, pacing),
+        ))
+    except LoginFailed as e:
+        return jsonify({"error": str(e)}), 401
+    except Overloaded as e:
+        return _refused(e)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+def _cached_batch(
+    site: str,
+    keywords: List[str],
+    batch_fn: Callable,
+    on_item: Optional[Callable[[Dict], None]] = None,
+    refresh: bool = False,
+    timings: bool = False,
+    wait: bool = False,
+    budget: Optional[ResponseBudget] = None,
+    authorize: Optional[Callable[[], None]] = None,
+) -> Dict:
+    """
+    Version lot de _cached_scrape : chaque mot-clé est d'abord cherché dans le cache
+    (même clé qu'une requête simple) et seuls les manquants sont scrapés, en un seul
+    passage admis. Un mot-clé en échec n'est pas mis en cache et figure dans "failed".
+    Les mots-clés trouvés en cache ne sont servis (et publiés) qu'après `authorize`,
+    appelé après le scrape des manquants : sa connexion suffit alors à le satisfaire.
+    """
+    outcomes: Dict[str, Dict] = {}
+    missing: List[str] = []
+    hits: Dict[str, Tuple[Dict, float]] = {}
+    for kw in keywords:
+        found = None if refresh else result_cache.get(make_key(site, kw))
+        if found is None:
+            missing.append(kw)
+        else:
+            hits[kw] = found
+
+    response: Dict = {}
+    if missing:
+        with admission.admit(queue_limit=not wait):
+            scraped = batch_fn(keywords=missing, on_item=on_item)
+        for kw in missing:
+            outcome = scraped["keywords"].get(kw) or _keyword_outcome([], "Mot-clé non traité")
+            if outcome["error"] is None:
+                result_cache.put(site, make_key(site, kw), {"items": outcome["items"]})
+            outcomes[kw] = {**outcome, "cache": {"status": "miss", "age_s": 0.0}}
+        response = {k: v for k, v in scraped.items() if k != "keywords"}
+        if not timings:
+            response.pop("timings", None)
+
+    if hits and authorize is not None:
+        authorize()
+    for kw, (value, age) in hits.items():
+        items = value.get("items", [])
+        if on_item is not None:
+            for item in items:
+                on_item({**item, "keyword": kw})
+        outcomes[kw] = {**_keyword_outcome(items), "cache": {"status": "hit", "age_s": round(age, 1)}}
+
+    results = [
+        {"keyword": kw, "status": "error" if outcomes[kw]["error"] else "ok", **outcomes[kw]} for kw in keywords
+    ]
+    if budget is not None:
+        for r in results:
+            r["items"] = budget.fit(r["items"])
+        response["payload"] = budget.stats()
+    return {
+        "results": results,
+        "failed": [r["keyword"] for r in results if r["status"] == "error"],
+        **response,
+    }
+
+
+def _submit_job(kind: str, params: Dict, fn: Callable) -> Tuple[Response, int]:
+    try:
+        job = job_manager.submit(kind, params, fn)
+    except QueueFull as e:
+        response = jsonify({"error": str(e)})
+        response.headers["Retry-After"] = "30"
+        return response, 429
+    return jsonify({
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/jobs/{job.id}",
+        "results_url": f"/jobs/{job.id}/results",
+        "items_url": f"/jobs/{job.id}/items",
+    }), 202
+
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id: str):
+    """État d'un job (sans les items)."""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify(job.to_dict())
+
+
+@app.route('/jobs/<job_id>/items', methods=['GET'])
+def job_items(job_id: str):
+    """
+    Items d'un job terminé, par pages : ?limit=N (100 par défaut, 1000 au plus) et
+    ?cursor=<next_cursor de la page précédente>. Une page s'arrête aussi à
+    SCRAPER_RESPONSE_MAX_BYTES ; max_item_chars / max_bytes donnés à la création du
+    job, ou en paramètres de la page, abaissent ces limites. next_cursor vaut null à la fin.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    if not job.finished:
+        return jsonify({"error": "Job not finished, stream /jobs/<id>/results instead", "status": job.status}), 409
+    try:
+        start = int(request.args.get('cursor') or 0)
+        limit = min(max(1, int(request.args.get('limit', 100))), 1000)
+        limits = ResponseBudget.limits(job.params)
+        for name, value in ResponseBudget.limits(request.args).items():
+            limits[name] = min(value, limits.get(name, value))
+        budget = ResponseBudget.from_request(limits) or ResponseBudget()
+    except ValueError:
+        return jsonify({"error": "Invalid cursor, limit or max_bytes"}), 400
+    if start < 0:
+        return jsonify({"error": "Invalid cursor, limit or max_bytes"}), 400
+
+    candidates = job.items_slice(start, start + limit)
+    page: List[Dict] = []
+    for item in candidates:
+        kept = budget.admit(item)
+        if kept is None:
+            if page:
+                break
+            # Un item seul plus gros que le budget : rendu coupé pour ne pas bloquer la pagination
+            kept = {**item, "text": "", "truncated": True}
+        page.append(kept)
+    end = start + len(page)
+    total = len(job.items)
+    return jsonify({
+        "job_id": job.id,
+        "status": job.status,
+        "total": total,
+        "items": page,
+        "next_cursor": str(end) if end < total else None,
+    })
+
+
+@app.route('/jobs/<job_id>/results', methods=['GET'])
+def job_results(job_id: str):
+    """
+    Diffuse les items du job pendant le scrape, en NDJSON par défaut ou en SSE
+    (Accept: text/event-stream ou ?format=sse). ?from=N reprend au N-ième item.
+    Le flux se termine par un évènement "end" portant l'état final du job. Le texte
+    des items est coupé au max_item_chars donné à la création du job.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    start = request.args.get('from', 0, type=int)
+    max_chars = min(job.params.get("max_item_chars", DEFAULT_ITEM_MAX_CHARS), DEFAULT_ITEM_MAX_CHARS)
+    sse = request.args.get('format') == 'sse' or 'text/event-stream' in request.headers.get('Accept', '')
+
+    def frame(event: str, payload: Dict) -> str:
+        body = json.dumps(payload, ensure_ascii=False)
+        if sse:
+            return f"event: {event}\ndata: {body}\n\n"
+        return json.dumps({"event": event, **payload}, ensure_ascii=False) + "\n"
+
+    def generate():
+        for entry in job.iter_items(start):
+            if entry is None:
+                # Maintient la connexion ouverte à travers les proxys
+                yield ": keep-alive\n\n" if sse else "\n"
+                continue
+            index, item = entry
+            item = clip_item(item, max_chars)
+            yield frame("item", {"index": index, "item": item})
+        final = job.to_dict()
+        yield frame("end", {"status": final["status"], "error": final["error"], "items": final["items"]})
+
+    mimetype = "text/event-stream" if sse else "application/x-ndjson"
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Mesures au format texte de Prometheus."""
+    with _browser_pools_lock:
+        pools = {("true" if headless else "false"): pool.stats() for headless, pool in _browser_pools.items()}
+    cache = result_cache.stats()
+    jobs = job_manager.stats()
+
+    lines = STAGE_SECONDS.render() + SCRAPE_SECONDS.render()
+    for name, help_text, kind, field in (
+        ("scraper_browser_pool_size", "Navigateurs du pool", "gauge", "size"),
+        ("scraper_browser_pool_busy", "Navigateurs occupés par un scrape", "gauge", "busy"),
+        ("scraper_browser_launches_total", "Lancements de navigateur", "counter", "launches"),
+        ("scraper_browser_recycles_total", "Navigateurs relancés (usure, mémoire)", "counter", "recycles"),
+    ):
+        lines += render_samples(
+            name, help_text, kind, [({"headless": h}, stats[field]) for h, stats in pools.items()]
+        )
+    lines += render_samples(
+        "scraper_browser_rss_mb", "RSS des navigateurs (Mo)", "gauge",
+        [
+            ({"headless": h, "slot": str(i)}, rss)
+            for h, stats in pools.items()
+            for i, rss in enumerate(stats["rss_mb"])
+        ],
+    )
+    lines += render_samples(
+        "scraper_cache_lookups_total", "Consultations du cache de résultats", "counter",
+        [({"result": r}, cache[r]) for r in ("hits", "sqlite_hits", "shared", "misses")],
+    )
+    lines += render_samples("scraper_cache_hit_ratio", "Part des scrapes servis sans navigateur", "gauge",
+                            [({}, cache["hit_rate"])])
+    lines += render_samples("scraper_cache_entries", "Résultats en mémoire", "gauge", [({}, cache["entries"])])
+    lines += render_samples(
+        "scraper_jobs", "Jobs par état", "gauge",
+        [({"status": "queued"}, jobs["queued"]), ({"status": "running"}, jobs["running"])],
+    )
+    return Response("\n".join(lines) + "\n", mimetype="text/plain; version=0.0.4")
+
+
 @app.route('/health', methods=['GET'])
 def health():
-    """Endpoint de santé pour vérifier que l'API fonctionne."""
-    return jsonify({"status": "ok"})
+    """
+    Santé et capacité réelle de ce worker : navigateurs, scrapes admis et en attente,
+    jobs. "saturated" = plus de place ni en cours ni en file ; 503 pendant l'arrêt.
+    """
+    gate = admission.stats()
+    with _browser_pools_lock:
+        pools = {("headless" if headless else "headed"): pool.stats() for headless, pool in _browser_pools.items()}
+    if _draining.is_set():
+        status = "draining"
+    elif gate["available"] == 0 and gate["waiting"] >= gate["max_waiting"]:
+        status = "saturated"
+    else:
+        status = "ok"
+    body = {
+        "status": status,
+        "pid": os.getpid(),
+        "capacity": gate,
+        "browsers": pools,
+        "jobs": job_manager.stats(),
+        "cache": result_cache.stats(),
+    }
+    return jsonify(body), (503 if status == "draining" else 200)
 
 
 if __name__ == '__main__':
-    # Lancez avec: python api_scraper.py
-    # Ou avec PM2: pm2 start api_scraper.py --interpreter python3
-    app.run(host='0.0.0.0', port=5000, debug=False)
+    # Développement : python api_scraper.py
+    # Production : gunicorn -c gunicorn.conf.py api_scraper:app
+    #   (avec PM2 : pm2 start "gunicorn -c gunicorn.conf.py api_scraper:app" --name api-scraper)
+    app.run(host='0.0.0.0', port=5000, debug=False, threaded=True)
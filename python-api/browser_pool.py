@@ -0,0 +1,265 @@
+# Pool de navigateurs Chromium persistants pour l'API de scraping.
+#
+# L'API sync de Playwright est liée au thread qui l'a démarrée : chaque navigateur
+# vit donc dans son propre thread ("slot"), et les handlers Flask lui confient une
+# fonction à exécuter avec un contexte neuf plutôt que de manipuler le navigateur
+# eux-mêmes.
+
+import os
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+from playwright.sync_api import sync_playwright
+
+
+class PoolTimeout(RuntimeError):
+    """Aucun navigateur ne s'est libéré dans le délai imparti."""
+
+
+def _read_proc_tree_rss_mb(root_pid: int) -> Optional[float]:
+    """Somme de la RSS (Mo) d'un processus et de ses descendants, via /proc (Linux)."""
+    if not os.path.isdir("/proc"):
+        return None
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "rb") as fh:
+                stat = fh.read()
+        except OSError:
+            continue
+        # Le nom du processus peut contenir des espaces : on repart de la dernière ')'
+        fields = stat[stat.rfind(b")") + 2:].split()
+        children.setdefault(int(fields[1]), []).append(int(entry))
+
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    total = 0
+    stack = [root_pid]
+    while stack:
+        pid = stack.pop()
+        try:
+            with open(f"/proc/{pid}/statm", "rb") as fh:
+                total += int(fh.read().split()[1]) * page_size
+        except (OSError, IndexError, ValueError):
+            continue
+        stack.extend(children.get(pid, ()))
+    return total / (1024 * 1024)
+
+
+def _find_pid_by_marker(marker: str) -> Optional[int]:
+    """Retrouve le processus principal du navigateur grâce à un argument marqueur."""
+    if not os.path.isdir("/proc"):
+        return None
+    needle = marker.encode()
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/cmdline", "rb") as fh:
+                if needle in fh.read():
+                    return int(entry)
+        except OSError:
+            continue
+    return None
+
+
+class _BrowserSlot(threading.Thread):
+    """Thread propriétaire d'une instance Playwright et d'un navigateur Chromium."""
+
+    def __init__(self, pool: "BrowserPool", index: int):
+        super().__init__(name=f"browser-slot-{index}", daemon=True)
+        self.pool = pool
+        self.index = index
+        self.jobs: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self.uses = 0
+        self.launches = 0
+        self.recycles = 0
+        self.last_rss_mb: Optional[float] = None
+        self._playwright = None
+        self._browser = None
+        self._browser_pid: Optional[int] = None
+
+    # --- cycle de vie du navigateur -------------------------------------------------
+
+    def _launch(self) -> None:
+        if self._playwright is None:
+            self._playwright = sync_playwright().start()
+        marker = f"--scraper-pool-slot={uuid.uuid4().hex}"
+        self._browser = self._playwright.chromium.launch(
+            headless=self.pool.headless,
+            args=[marker, *self.pool.launch_args],
+        )
+        self._browser_pid = _find_pid_by_marker(marker)
+        self.uses = 0
+        self.launches += 1
+
+    def _close_browser(self) -> None:
+        browser, self._browser, self._browser_pid = self._browser, None, None
+        if browser is not None:
+            try:
+                browser.close()
+            except Exception:
+                pass
+
+    def _ensure_healthy(self) -> None:
+        if self._browser is not None and not self._browser.is_connected():
+            self._close_browser()
+        if self._browser is None:
+            self._launch()
+
+    def _should_recycle(self) -> bool:
+        if self._browser is None:
+            return False
+        if not self._browser.is_connected():
+            return True
+        if self.pool.max_uses and self.uses >= self.pool.max_uses:
+            return True
+        if self.pool.max_rss_mb and self._browser_pid:
+            self.last_rss_mb = _read_proc_tree_rss_mb(self._browser_pid)
+            if self.last_rss_mb is not None and self.last_rss_mb > self.pool.max_rss_mb:
+                return True
+        return False
+
+    # --- boucle du thread -----------------------------------------------------------
+
+    def run(self) -> None:
+        try:
+            while True:
+                job = self.jobs.get()
+                if job is None:
+                    break
+                fn, context_options, future = job
+                try:
+                    if future.set_running_or_notify_cancel():
+                        self._run_job(fn, context_options, future)
+                finally:
+                    if self._should_recycle():
+                        self.recycles += 1
+                        self._close_browser()
+                    self.pool._release(self)
+        finally:
+            self._close_browser()
+            if self._playwright is not None:
+                try:
+                    self._playwright.stop()
+                except Exception:
+                    pass
+                self._playwright = None
+
+    def _run_job(self, fn: Callable, context_options: Dict[str, Any], future: Future) -> None:
+        try:
+            self._ensure_healthy()
+            context = self._browser.new_context(**context_options)
+        except BaseException as exc:
+            self._close_browser()
+            future.set_exception(exc)
+            return
+        self.uses += 1
+        try:
+            future.set_result(fn(context))
+        except BaseException as exc:
+            future.set_exception(exc)
+        finally:
+            try:
+                context.close()
+            except Exception:
+                pass
+
+
+class BrowserPool:
+    """
+    Pool de `size` navigateurs Chromium réutilisés d'une requête à l'autre.
+
+    Chaque appel à `run` emprunte un navigateur libre, lui crée un contexte neuf
+    (cookies isolés), exécute `fn(context)` dans le thread du navigateur puis ferme
+    le contexte. Un navigateur est relancé s'il s'est déconnecté, après `max_uses`
+    utilisations, ou quand sa RSS (processus enfants compris) dépasse `max_rss_mb`.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        headless: bool = True,
+        max_uses: int = 50,
+        max_rss_mb: int = 1500,
+        lease_timeout: float = 120.0,
+        launch_args: Optional[List[str]] = None,
+    ):
+        self.size = max(1, size)
+        self.headless = headless
+        self.max_uses = max_uses
+        self.max_rss_mb = max_rss_mb
+        self.lease_timeout = lease_timeout
+        self.launch_args = list(launch_args or [])
+        self._idle: "queue.Queue[_BrowserSlot]" = queue.Queue()
+        self._slots = [_BrowserSlot(self, i) for i in range(self.size)]
+        self._closed = False
+        for slot in self._slots:
+            slot.start()
+            self._idle.put(slot)
+
+    @classmethod
+    def from_env(cls, headless: bool = True) -> "BrowserPool":
+        return cls(
+            size=int(os.environ.get("SCRAPER_POOL_SIZE", "2")),
+            headless=headless,
+            max_uses=int(os.environ.get("SCRAPER_POOL_MAX_USES", "50")),
+            max_rss_mb=int(os.environ.get("SCRAPER_POOL_MAX_RSS_MB", "1500")),
+            lease_timeout=float(os.environ.get("SCRAPER_POOL_LEASE_TIMEOUT", "120")),
+        )
+
+    def _release(self, slot: _BrowserSlot) -> None:
+        if not self._closed:
+            self._idle.put(slot)
+
+    def submit(
+        self,
+        fn: Callable[[Any], Any],
+        context_options: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> Future:
+        """Confie `fn(context)` à un navigateur libre ; lève PoolTimeout si aucun ne se libère."""
+        if self._closed:
+            raise RuntimeError("Le pool de navigateurs est fermé")
+        try:
+            slot = self._idle.get(timeout=self.lease_timeout if timeout is None else timeout)
+        except queue.Empty:
+            raise PoolTimeout(f"Aucun navigateur disponible (pool de {self.size})")
+        future: Future = Future()
+        slot.jobs.put((fn, dict(context_options or {}), future))
+        return future
+
+    def run(
+        self,
+        fn: Callable[[Any], Any],
+        context_options: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        return self.submit(fn, context_options=context_options, timeout=timeout).result()
+
+    def stats(self) -> Dict[str, Any]:
+        idle = self._idle.qsize()
+        return {
+            "size": self.size,
+            "idle": idle,
+            "busy": self.size - idle,
+            "launches": sum(s.launches for s in self._slots),
+            "recycles": sum(s.recycles for s in self._slots),
+            "rss_mb": [s.last_rss_mb for s in self._slots],
+        }
+
+    def close(self, timeout: float = 30.0) -> None:
+        """Arrête les navigateurs une fois leurs tâches en cours terminées."""
+        if self._closed:
+            return
+        self._closed = True
+        for slot in self._slots:
+            slot.jobs.put(None)
+        deadline = time.monotonic() + timeout
+        for slot in self._slots:
+            slot.join(max(0.0, deadline - time.monotonic()))
@@ -0,0 +1,147 @@
+# Frontière de crawl BFS et budget de politesse par hôte pour le scraper.
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Paramètres de suivi retirés des URLs avant dédoublonnage
+TRACKING_PARAMS = {
+    "fbclid",
+    "gclid",
+    "dclid",
+    "msclkid",
+    "mc_cid",
+    "mc_eid",
+    "_ga",
+    "_gl",
+    "igshid",
+    "yclid",
+    "xtor",
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "matomo_")
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Schéma et hôte en minuscules, sans fragment, port par défaut ni paramètres de suivi.
+    ValueError si l'URL est mal formée (port hors limites, crochets IPv6 non fermés).
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    port = parts.port
+    netloc = host
+    if port and not ((scheme == "http" and port == 80) or (scheme == "https" and port == 443)):
+        netloc = f"{host}:{port}"
+    if parts.username:
+        netloc = f"{parts.username}@{netloc}"
+    query = [
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    ]
+    return urlunsplit((scheme, netloc, parts.path or "/", urlencode(query, doseq=True), ""))
+
+
+class CrawlFrontier:
+    """
+    File BFS des pages à visiter : retrait en O(1) et dédoublonnage dès l'ajout,
+    sur l'URL canonique (une page déjà vue ou déjà en file n'est jamais ré-ajoutée).
+    La file garde l'URL d'origine : c'est elle qui est chargée, la forme canonique
+    ne sert que de clé. `accept` ne filtre que les liens découverts, pas les graines.
+    """
+
+    def __init__(self, max_depth: int, accept: Optional[Callable[[str], bool]] = None):
+        self.max_depth = max_depth
+        self.accept = accept
+        self._queue: "deque[Tuple[str, int]]" = deque()
+        self._seen: set = set()
+
+    def seed(self, url: str) -> bool:
+        """URL de départ (profondeur 0), fournie par l'appelant : pas de filtre `accept`."""
+        return self._add(url, 0, check=False)
+
+    def push(self, url: str, depth: int) -> bool:
+        return self._add(url, depth, check=True)
+
+    def _add(self, url: str, depth: int, check: bool) -> bool:
+        if not isinstance(url, str) or not url or depth > self.max_depth:
+            return False
+        url = url.strip()
+        if not url.startswith(("http://", "https://")):
+            return False
+        try:
+            canonical = canonicalize_url(url)
+        except ValueError:  # port hors limites, IPv6 mal formée : lien ignoré
+            return False
+        if canonical in self._seen:
+            return False
+        if check and self.accept is not None and not self.accept(canonical):
+            return False
+        self._seen.add(canonical)
+        self._queue.append((url, depth))
+        return True
+
+    def push_front(self, items: List[Tuple[str, int]]) -> None:
+        """Remet en tête des entrées déjà acceptées (reportées par le budget d'hôte)."""
+        self._queue.extendleft(reversed(items))
+
+    def pop(self) -> Tuple[str, int]:
+        return self._queue.popleft()
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    @property
+    def seen(self) -> int:
+        return len(self._seen)
+
+
+class HostBudget:
+    """
+    Politesse par hôte, commune à tous les scrapes du processus : au plus
+    `max_concurrent` pages en cours de chargement et au moins `min_interval`
+    secondes entre deux débuts de navigation vers le même hôte. Un slot est pris
+    par acquire() avant la navigation et rendu par release() une fois la page chargée.
+    """
+
+    def __init__(self, max_concurrent: int = 2, min_interval: float = 0.5):
+        self.max_concurrent = max(1, max_concurrent)
+        self.min_interval = max(0.0, min_interval)
+        self._cond = threading.Condition()
+        self._active: Dict[str, int] = {}
+        self._last_start: Dict[str, float] = {}
+
+    def acquire(self, host: str, block: bool = True) -> bool:
+        """
+        Prend un slot pour `host` puis attend son tour de départ. Sans `block`,
+        renvoie False tout de suite si l'hôte est saturé : un appelant qui détient
+        déjà des slots ne doit pas attendre ceux des autres (interblocage).
+        """
+        with self._cond:
+            while self._active.get(host, 0) >= self.max_concurrent:
+                if not block:
+                    return False
+                self._cond.wait()
+            self._active[host] = self._active.get(host, 0) + 1
+            now = time.monotonic()
+            start_at = max(now, self._last_start.get(host, 0.0) + self.min_interval)
+            self._last_start[host] = start_at
+        if start_at > now:
+            time.sleep(start_at - now)
+        return True
+
+    def release(self, host: str) -> None:
+        with self._cond:
+            remaining = self._active.get(host, 0) - 1
+            if remaining > 0:
+                self._active[host] = remaining
+            else:
+                self._active.pop(host, None)
+            self._cond.notify_all()
+
+    def active(self, host: str) -> int:
+        with self._cond:
+            return self._active.get(host, 0)
@@ -0,0 +1,71 @@
+# Extraction groupée des blocs de résultats : un seul aller-retour avec le navigateur
+# par page (evaluate_all) au lieu de plusieurs appels par bloc.
+#
+# Chaque site est décrit par une spec déclarative :
+#   blocks    sélecteur des blocs de résultat
+#   title     élément portant le titre, relatif au bloc (":scope" = le bloc lui-même)
+#   href      élément portant le lien, relatif au bloc
+#   snippet   élément portant l'extrait, relatif au bloc (None = pas d'extrait)
+#   limit     nombre maximal de blocs (None = tous)
+#   title_max longueur maximale du titre (None = pas de coupe)
+
+from typing import Dict, List, Optional
+
+EXTRACTION_SPECS: Dict[str, Dict] = {
+    "droitdusport": {
+        "blocks": ".search-result",
+        "title": "a",
+        "href": "a",
+        "snippet": ":scope",
+        "limit": None,
+        "title_max": None,
+    },
+    "dalloz": {
+        "blocks": "a[href*='/documentation/']",
+        "title": ":scope",
+        "href": ":scope",
+        "snippet": None,
+        "limit": 10,
+        "title_max": 200,
+    },
+}
+
+_EXTRACT_JS = """
+(els, spec) => {
+  const pick = (el, sel) => !sel ? null : (sel === ':scope' ? el : el.querySelector(sel));
+  const blocks = spec.limit ? els.slice(0, spec.limit) : els;
+  return blocks.map(el => {
+    const t = pick(el, spec.title);
+    const h = pick(el, spec.href);
+    const s = pick(el, spec.snippet);
+    return {
+      title: t ? (t.textContent || '') : '',
+      href: h ? (h.href || h.getAttribute('href') || '') : '',
+      snippet: s ? (s.textContent || '') : '',
+    };
+  });
+}
+"""
+
+
+def extract_results(page, site: str, fallback_url: str = "") -> List[Dict]:
+    """
+    Renvoie les blocs de résultats de `page` selon la spec du site, sous la forme
+    d'items {"url", "title", "text"}. Liste vide si la page n'en contient pas.
+    """
+    spec = EXTRACTION_SPECS[site]
+    raw = page.locator(spec["blocks"]).evaluate_all(_EXTRACT_JS, spec)
+    title_max: Optional[int] = spec.get("title_max")
+    items: List[Dict] = []
+    for block in raw:
+        if not isinstance(block, dict):
+            continue
+        title = (block.get("title") or "").strip()
+        if title_max:
+            title = title[:title_max]
+        items.append({
+            "url": block.get("href") or fallback_url,
+            "title": title,
+            "text": (block.get("snippet") or "").strip(),
+        })
+    return items
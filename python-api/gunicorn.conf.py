@@ -0,0 +1,77 @@
+# Configuration gunicorn de l'API de scraping (production).
+#
+#   pip install gunicorn
+#   gunicorn -c gunicorn.conf.py api_scraper:app
+#
+# Chaque worker est un processus isolé qui importe l'application après le fork et
+# possède donc sa propre instance Playwright et son pool de SCRAPER_POOL_SIZE
+# navigateurs : pas de preload, Playwright ne survit pas à un fork. Dans un worker,
+# des threads servent les requêtes ; les scrapes eux-mêmes tournent dans les threads
+# du pool de navigateurs.
+#
+# Un seul worker par défaut : les jobs (mode "job") n'existent que dans la mémoire du
+# worker qui les a créés, et /jobs/<id> répondrait 404 une fois sur deux avec deux
+# workers. On monte en charge avec SCRAPER_POOL_SIZE (navigateurs du worker). Avec
+# SCRAPER_WORKERS > 1, il faut un répartiteur avec affinité devant /jobs/<id>, et
+# SCRAPER_CACHE_DB pour partager le cache.
+#
+# Réglages : SCRAPER_BIND, SCRAPER_WORKERS, SCRAPER_THREADS, SCRAPER_GRACEFUL_TIMEOUT.
+
+import os
+
+bind = os.environ.get("SCRAPER_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("SCRAPER_WORKERS", "1"))
+worker_class = "gthread"
+
+# Scrapes admis + file d'attente + flux de résultats des jobs et /health
+_browsers = int(os.environ.get("SCRAPER_POOL_SIZE", "2"))
+_waiting = int(os.environ.get("SCRAPER_ADMISSION_QUEUE", "4"))
+threads = int(os.environ.get("SCRAPER_THREADS", str(_browsers + _waiting + 8)))
+
+preload_app = False
+
+# Un scrape peut durer plusieurs minutes ; le worker gthread reste vivant pendant ce temps
+timeout = 120
+# À l'arrêt (SIGTERM), les scrapes en cours ont ce délai pour se terminer
+graceful_timeout = int(os.environ.get("SCRAPER_GRACEFUL_TIMEOUT", "90"))
+keepalive = 5
+
+
+def post_worker_init(worker):
+    """
+    Gunicorn n'a pas de hook pour SIGTERM : on enveloppe son gestionnaire pour passer
+    l'application en "draining" dès le début de l'arrêt gracieux. /health répond alors
+    503 (le répartiteur retire le worker) et aucun nouveau scrape n'est admis pendant
+    que ceux en cours se terminent dans graceful_timeout.
+    """
+    import signal
+
+    previous = signal.getsignal(signal.SIGTERM)
+
+    def on_sigterm(signum, frame):
+        _app_call("begin_draining")
+        if callable(previous):
+            previous(signum, frame)
+
+    signal.signal(signal.SIGTERM, on_sigterm)
+
+
+def worker_int(worker):
+    """Ctrl-C / SIGINT : on ferme quand même les navigateurs."""
+    _shutdown_app()
+
+
+def worker_exit(server, worker):
+    _shutdown_app()
+
+
+def _shutdown_app():
+    _app_call("shutdown")
+
+
+def _app_call(name):
+    import sys
+
+    app_module = sys.modules.get("api_scraper")
+    if app_module is not None:
+        getattr(app_module, name)()
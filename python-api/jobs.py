@@ -0,0 +1,158 @@
+# Exécution des scrapes en tâche de fond (mode "job" de l'API).
+#
+# Un POST crée un job et rend la main tout de suite ; une file bornée de workers
+# exécute les scrapes, et les items sont lisibles au fil de l'eau pendant le scrape.
+
+import queue
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class QueueFull(RuntimeError):
+    """La file des jobs est pleine : le client doit réessayer plus tard."""
+
+
+class Job:
+    """État d'un scrape en tâche de fond et items produits jusqu'ici."""
+
+    def __init__(self, kind: str, params: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params  # paramètres publics uniquement (pas d'identifiants)
+        self.status = "queued"
+        self.error: Optional[str] = None
+        self.result: Dict[str, Any] = {}
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.items: List[Dict[str, Any]] = []
+        self._cond = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def emit(self, item: Dict[str, Any]) -> None:
+        with self._cond:
+            self.items.append(item)
+            self._cond.notify_all()
+
+    def _start(self) -> None:
+        with self._cond:
+            self.status = "running"
+            self.started_at = time.time()
+
+    def _finish(self, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> None:
+        with self._cond:
+            if result:
+                # Les items ont déjà été reçus via emit ; on ne garde que le reste (stats...)
+                self.result = {k: v for k, v in result.items() if k != "items"}
+            self.error = error
+            self.status = "failed" if error else "done"
+            self.finished_at = time.time()
+            self._cond.notify_all()
+
+    def items_slice(self, start: int, stop: int) -> List[Dict[str, Any]]:
+        with self._cond:
+            return self.items[start:stop]
+
+    def iter_items(self, start: int = 0, heartbeat: float = 15.0) -> Iterator[Optional[Tuple[int, Dict[str, Any]]]]:
+        """
+        Génère (index, item) à partir de `start`, en attendant les suivants tant que
+        le job tourne. Produit None toutes les `heartbeat` secondes sans nouvel item,
+        pour que l'appelant puisse garder la connexion ouverte.
+        """
+        index = max(0, start)
+        while True:
+            with self._cond:
+                if index >= len(self.items) and not self.finished:
+                    self._cond.wait(heartbeat)
+                batch = self.items[index:]
+                finished = self.finished
+            if batch:
+                for offset, item in enumerate(batch):
+                    yield index + offset, item
+                index += len(batch)
+            elif finished:
+                return
+            else:
+                yield None
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "job_id": self.id,
+                "kind": self.kind,
+                "params": self.params,
+                "status": self.status,
+                "error": self.error,
+                "items": len(self.items),
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                **self.result,
+            }
+
+
+class JobManager:
+    """
+    `workers` threads consomment une file d'au plus `max_queued` jobs en attente.
+    Les jobs terminés sont oubliés après `retention` secondes.
+    """
+
+    def __init__(self, workers: int = 2, max_queued: int = 20, retention: float = 3600.0):
+        self.retention = retention
+        self._queue: "queue.Queue[Tuple[Job, Callable]]" = queue.Queue(maxsize=max(1, max_queued))
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._workers = [
+            threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, kind: str, params: Dict[str, Any], fn: Callable[[Callable[[Dict], None]], Dict]) -> Job:
+        """Met `fn(emit)` en file ; `emit(item)` publie un item dès qu'il est extrait."""
+        self._purge()
+        job = Job(kind, params)
+        with self._lock:
+            self._jobs[job.id] = job
+        try:
+            self._queue.put_nowait((job, fn))
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job.id]
+            raise QueueFull("Trop de scrapes en attente, réessayez plus tard")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return {
+            "workers": len(self._workers),
+            "queued": sum(1 for j in jobs if j.status == "queued"),
+            "running": sum(1 for j in jobs if j.status == "running"),
+            "capacity": self._queue.maxsize,
+        }
+
+    def _purge(self) -> None:
+        limit = time.time() - self.retention
+        with self._lock:
+            for job_id in [j.id for j in self._jobs.values() if j.finished and (j.finished_at or 0) < limit]:
+                del self._jobs[job_id]
+
+    def _work(self) -> None:
+        while True:
+            job, fn = self._queue.get()
+            job._start()
+            try:
+                job._finish(result=fn(job.emit))
+            except Exception as exc:
+                job._finish(error=str(exc))
@@ -0,0 +1,166 @@
+# Chargement "lean" des pages Playwright : blocage des ressources inutiles au scraping
+# (images, polices, médias, analytics, publicité) et attente d'un sélecteur cible
+# plutôt que de networkidle. Mesure aussi les octets reçus et le temps de chargement
+# de chaque page, pour régler le mode site par site.
+
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+DEFAULT_BLOCKED_TYPES = frozenset({"image", "font", "media"})
+
+# Domaines de mesure d'audience et de publicité, bloqués même en mode first-party souple
+DEFAULT_BLOCKED_DOMAINS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "doubleclick.net",
+    "adservice.google.com",
+    "facebook.net",
+    "connect.facebook.net",
+    "hotjar.com",
+    "criteo.com",
+    "criteo.net",
+    "xiti.com",
+    "ati-host.net",
+    "smartadserver.com",
+    "taboola.com",
+    "outbrain.com",
+    "scorecardresearch.com",
+    "quantserve.com",
+    "matomo.cloud",
+    "clarity.ms",
+)
+
+# Réglages par site : domaines "maison" et élément qui signale que la page est exploitable
+LEAN_SITES: Dict[str, Dict] = {
+    "droitdusport": {
+        "first_party": ("droitdusport.com",),
+        "result_selector": ".search-result",
+    },
+    "dalloz": {
+        # Le parcours de connexion passe par le catalogue de la BU et le CAS universitaire
+        "first_party": ("dalloz.fr", "u-bourgogne.fr", "exlibrisgroup.com", "renater.fr"),
+        "result_selector": "a[href*='/documentation/']",
+    },
+}
+
+
+def _host_matches(host: str, domains: Iterable[str]) -> bool:
+    return any(host == d or host.endswith("." + d) for d in domains)
+
+
+class LeanLoader:
+    """
+    S'attache à un contexte Playwright (`attach`) pour filtrer ses requêtes, et
+    remplace les attentes networkidle par `goto` / `wait_ready`.
+
+    Les octets sont comptés d'après Content-Length (les réponses sans cet en-tête
+    sont comptées à part) ; comparer `bytes_received` avec et sans le mode lean
+    donne les octets économisés.
+    """
+
+    def __init__(
+        self,
+        first_party: Iterable[str] = (),
+        block: bool = True,
+        block_types: Iterable[str] = DEFAULT_BLOCKED_TYPES,
+        block_domains: Iterable[str] = DEFAULT_BLOCKED_DOMAINS,
+        block_third_party: bool = False,
+        selector_timeout_ms: int = 10000,
+    ):
+        self.first_party = tuple(first_party)
+        self.block = block
+        self.block_types = frozenset(block_types)
+        self.block_domains = tuple(block_domains)
+        self.block_third_party = block_third_party and bool(self.first_party)
+        self.selector_timeout_ms = selector_timeout_ms
+        self._lock = threading.Lock()
+        self._blocked: Counter = Counter()
+        self._allowed = 0
+        self._bytes = 0
+        self._unsized = 0
+        self._pages: List[Dict] = []
+
+    @classmethod
+    def for_site(cls, site: str, **overrides) -> "LeanLoader":
+        options = {"first_party": LEAN_SITES.get(site, {}).get("first_party", ())}
+        options.update(overrides)
+        return cls(**options)
+
+    # --- interception ---------------------------------------------------------------
+
+    def attach(self, context) -> None:
+        if self.block:
+            context.route("**/*", self._route)
+        context.on("response", self._on_response)
+
+    def _block_reason(self, request) -> Optional[str]:
+        if request.resource_type in self.block_types:
+            return request.resource_type
+        host = (urlparse(request.url).hostname or "").lower()
+        if not host:
+            return None
+        if _host_matches(host, self.block_domains):
+            return "tracker"
+        if self.block_third_party and not _host_matches(host, self.first_party):
+            return "third-party"
+        return None
+
+    def _route(self, route) -> None:
+        reason = self._block_reason(route.request)
+        if reason is None:
+            with self._lock:
+                self._allowed += 1
+            route.continue_()
+            return
+        with self._lock:
+            self._blocked[reason] += 1
+        route.abort("blockedbyclient")
+
+    def _on_response(self, response) -> None:
+        length = response.headers.get("content-length")
+        with self._lock:
+            if length and length.isdigit():
+                self._bytes += int(length)
+            else:
+                self._unsized += 1
+
+    # --- attentes -------------------------------------------------------------------
+
+    def wait_ready(self, page, selector: Optional[str] = None) -> None:
+        """Attend le sélecteur cible s'il est donné (repli sur "load"), sinon "load"."""
+        if selector:
+            try:
+                page.wait_for_selector(selector, state="attached", timeout=self.selector_timeout_ms)
+                return
+            except Exception:
+                pass
+        page.wait_for_load_state("load")
+
+    def goto(self, page, url: str, selector: Optional[str] = None) -> None:
+        started = time.monotonic()
+        page.goto(url, wait_until="domcontentloaded")
+        self.wait_ready(page, selector)
+        self.record_page(url, started)
+
+    def record_page(self, url: str, started: float) -> None:
+        with self._lock:
+            self._pages.append({"url": url, "load_ms": round((time.monotonic() - started) * 1000)})
+
+    def stats(self) -> Dict:
+        with self._lock:
+            loads = sorted(p["load_ms"] for p in self._pages)
+            return {
+                "blocking": self.block,
+                "requests_allowed": self._allowed,
+                "requests_blocked": sum(self._blocked.values()),
+                "blocked_by_reason": dict(self._blocked),
+                "bytes_received": self._bytes,
+                "responses_without_length": self._unsized,
+                "pages": list(self._pages),
+                "median_load_ms": loads[len(loads) // 2] if loads else None,
+            }
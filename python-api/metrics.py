@@ -0,0 +1,148 @@
+# Mesures des scrapes : temps par étape (spans) et exposition au format texte de
+# Prometheus pour l'endpoint /metrics, sans dépendance externe.
+#
+# Étapes : browser (attente d'un navigateur libre, lancement, contexte), login,
+# search, crawl, navigation, wait (networkidle / sélecteur cible), sleep et typing
+# (rythme "humain" volontaire), extraction, other (temps non attribué).
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0, 60.0, 120.0)
+MAX_SPANS = 200  # au-delà, seuls les cumuls par étape sont gardés
+
+
+class StageTimer:
+    """
+    Chronomètre d'un scrape. Les spans peuvent s'imbriquer (une navigation pendant
+    la connexion) : chaque étape ne compte que son temps propre, hors sous-étapes,
+    si bien que la somme des étapes est égale à la durée totale.
+    """
+
+    def __init__(self, started: Optional[float] = None):
+        self.started = time.monotonic() if started is None else started
+        self.finished: Optional[float] = None
+        self._stack: List[List] = []  # [étape, temps des sous-étapes]
+        self._self: Dict[str, float] = {}
+        self._spans: List[Dict] = []
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        start = time.monotonic()
+        self._stack.append([stage, 0.0])
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - start
+            _, children = self._stack.pop()
+            self._self[stage] = self._self.get(stage, 0.0) + elapsed - children
+            if self._stack:
+                self._stack[-1][1] += elapsed
+            if len(self._spans) < MAX_SPANS:
+                self._spans.append({
+                    "stage": stage,
+                    "start_ms": round((start - self.started) * 1000, 1),
+                    "ms": round(elapsed * 1000, 1),
+                    "depth": len(self._stack),
+                })
+
+    def add(self, stage: str, seconds: float) -> None:
+        """Temps mesuré hors du chronomètre (ex. attente du navigateur avant le scrape)."""
+        self._self[stage] = self._self.get(stage, 0.0) + max(0.0, seconds)
+
+    def finish(self) -> None:
+        if self.finished is None:
+            self.finished = time.monotonic()
+
+    @property
+    def total(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+    def stage_seconds(self) -> Dict[str, float]:
+        stages = dict(self._self)
+        stages["other"] = max(0.0, self.total - sum(stages.values()))
+        return stages
+
+    def to_dict(self) -> Dict:
+        return {
+            "total_ms": round(self.total * 1000, 1),
+            "stages_ms": {k: round(v * 1000, 1) for k, v in sorted(self.stage_seconds().items())},
+            "spans": list(self._spans),
+        }
+
+
+# --- Prometheus ----------------------------------------------------------------------
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], List] = {}  # labels -> [compteurs, somme, total]
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(k, list(v[0]), v[1], v[2]) for k, v in sorted(self._series.items())]
+        for labelvalues, counts, total, count in snapshot:
+            for bound, cumulated in zip(self.buckets, counts):
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labelvalues, le)} {cumulated}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labelvalues)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labelvalues)} {count}")
+        return lines
+
+
+def render_samples(name: str, help: str, kind: str, samples: Iterable[Tuple[Dict[str, str], float]]) -> List[str]:
+    """Gauge ou counter calculé au moment de la collecte : samples = [(labels, valeur)]."""
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        if value is None:
+            continue
+        lines.append(f"{name}{_labels(list(labels), list(labels.values()))} {_number(value)}")
+    return lines
+
+
+STAGE_SECONDS = Histogram(
+    "scraper_stage_seconds", "Temps propre de chaque étape d'un scrape", ("site", "stage")
+)
+SCRAPE_SECONDS = Histogram("scraper_scrape_seconds", "Durée totale d'un scrape", ("site",))
+
+
+def observe_run(site: str, timer: StageTimer) -> None:
+    timer.finish()
+    for stage, seconds in timer.stage_seconds().items():
+        STAGE_SECONDS.observe(seconds, site, stage)
+    SCRAPE_SECONDS.observe(timer.total, site)
@@ -0,0 +1,117 @@
+# Rythme "humain" des scrapes : profils nommés, ralentissement adaptatif et
+# comptabilité du temps passé en pauses volontaires.
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+THROTTLE_STATUSES = frozenset({429, 503})
+
+
+@dataclass(frozen=True)
+class PacingProfile:
+    name: str
+    sleep_scale: float  # multiplie les plages de pause demandées par l'appelant
+    type_delay_ms: Tuple[int, int]  # délai entre deux caractères tapés
+    scroll_steps: Tuple[int, int]  # nombre de coups de molette par page
+
+
+PACING_PROFILES: Dict[str, PacingProfile] = {
+    "stealth": PacingProfile("stealth", 2.0, (90, 200), (2, 4)),
+    "normal": PacingProfile("normal", 1.0, (60, 140), (1, 3)),
+    "fast": PacingProfile("fast", 0.0, (0, 0), (0, 0)),
+}
+
+# Du plus rapide au plus prudent : un signal de throttling fait monter d'un cran
+ESCALATION = ("fast", "normal", "stealth")
+
+
+class Pacer:
+    """
+    Applique un profil de rythme pour un scrape.
+
+    En mode adaptatif, chaque signal de throttling (réponse 429/503, page de
+    captcha) fait passer au profil plus prudent suivant ; sans signal, on reste
+    sur le profil demandé, "fast" compris. Le temps passé en pauses et en frappe
+    ralentie est cumulé dans `delay_s`.
+    """
+
+    def __init__(self, profile: str = "normal", adaptive: bool = False):
+        if profile not in PACING_PROFILES:
+            raise ValueError(f"Profil de rythme inconnu : {profile} ({', '.join(PACING_PROFILES)})")
+        self.requested = profile
+        self.profile = PACING_PROFILES[profile]
+        self.adaptive = adaptive
+        self.delay_s = 0.0
+        self.throttle_signals = 0
+        self.started_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _account(self, seconds: float) -> None:
+        with self._lock:
+            self.delay_s += seconds
+
+    def sleep(self, min_ms: int = 300, max_ms: int = 1200) -> None:
+        scale = self.profile.sleep_scale
+        if scale <= 0:
+            return
+        delay = random.uniform(min_ms, max_ms) * scale / 1000.0
+        self._account(delay)
+        time.sleep(delay)
+
+    def type_into(self, locator, text: str) -> None:
+        """Tape `text` dans le champ, caractère par caractère sauf en profil rapide."""
+        low, high = self.profile.type_delay_ms
+        if high <= 0:
+            locator.fill(text)
+            return
+        delay = random.randint(low, high)
+        started = time.monotonic()
+        locator.type(text, delay=delay)
+        # Seul le délai entre caractères est volontaire, pas l'aller-retour navigateur
+        self._account(min(time.monotonic() - started, delay * len(text) / 1000.0))
+
+    def scroll_steps(self) -> int:
+        low, high = self.profile.scroll_steps
+        return random.randint(low, high) if high > 0 else 0
+
+    def observe_response(self, response) -> None:
+        """À brancher sur context.on("response") pour détecter le throttling."""
+        try:
+            if response.status in THROTTLE_STATUSES and response.request.resource_type == "document":
+                self.on_throttle()
+            elif "captcha" in response.url.lower() and response.request.resource_type == "document":
+                self.on_throttle()
+        except Exception:
+            pass
+
+    def on_throttle(self) -> None:
+        with self._lock:
+            self.throttle_signals += 1
+            if not self.adaptive:
+                return
+            index = ESCALATION.index(self.profile.name)
+            if index + 1 < len(ESCALATION):
+                self.profile = PACING_PROFILES[ESCALATION[index + 1]]
+
+    def stats(self) -> Dict:
+        total = time.monotonic() - self.started_at
+        with self._lock:
+            return {
+                "profile": self.requested,
+                "final_profile": self.profile.name,
+                "adaptive": self.adaptive,
+                "throttle_signals": self.throttle_signals,
+                "delay_s": round(self.delay_s, 3),
+                "work_s": round(max(0.0, total - self.delay_s), 3),
+                "total_s": round(total, 3),
+            }
+
+
+def parse_pacing(value, adaptive=None, default: str = "normal") -> Tuple[str, bool]:
+    """Lit le profil demandé par l'API : "fast", ou {"profile": "fast", "adaptive": true}."""
+    if isinstance(value, dict):
+        return str(value.get("profile") or default), bool(value.get("adaptive", adaptive or False))
+    return str(value or default), bool(adaptive or False)
@@ -0,0 +1,165 @@
+# Taille des réponses de l'API : texte des pages débarrassé des menus, en-têtes et
+# pieds de page, borné par item et par réponse, puis compressé (gzip, ou br si le
+# module brotli est installé) quand le client l'accepte.
+#
+# Réglages : SCRAPER_ITEM_MAX_CHARS (texte d'un item), SCRAPER_RESPONSE_MAX_BYTES
+# (items d'une réponse, JSON encodé), SCRAPER_COMPRESS_MIN_BYTES.
+
+import gzip
+import json
+import os
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_ITEM_MAX_CHARS = int(os.environ.get("SCRAPER_ITEM_MAX_CHARS", "50000"))
+DEFAULT_RESPONSE_MAX_BYTES = int(os.environ.get("SCRAPER_RESPONSE_MAX_BYTES", str(5 * 1024 * 1024)))
+COMPRESS_MIN_BYTES = int(os.environ.get("SCRAPER_COMPRESS_MIN_BYTES", "1024"))
+
+# Éléments qui ne portent pas le contenu de la page
+BOILERPLATE_SELECTORS = ", ".join([
+    "script", "style", "noscript", "template", "svg", "iframe",
+    "nav", "header", "footer", "aside", "form",
+    "[role='navigation']", "[role='banner']", "[role='contentinfo']", "[role='search']",
+    "[aria-hidden='true']", "[id*='cookie' i]", "[class*='cookie' i]",
+])
+
+_MAIN_TEXT_JS = """
+(selectors) => {
+  // Un seul <article> = la page de contenu ; plusieurs = une liste (résultats), on garde tout
+  const articles = document.querySelectorAll('article');
+  const root = document.querySelector("main, [role='main']")
+    || (articles.length === 1 ? articles[0] : null)
+    || document.body;
+  if (!root) return '';
+  const copy = root.cloneNode(true);
+  copy.querySelectorAll(selectors).forEach(el => el.remove());
+  return copy.textContent || '';
+}
+"""
+
+
+def clean_text(text: str) -> str:
+    """Espaces regroupés, lignes vides et lignes répétées à la suite supprimées."""
+    lines: List[str] = []
+    for raw in (text or "").splitlines():
+        line = " ".join(raw.split())
+        if line and (not lines or lines[-1] != line):
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def page_text(page) -> str:
+    """Texte utile de la page (zone principale sans menus) ; corps entier en secours."""
+    try:
+        text = page.evaluate(_MAIN_TEXT_JS, BOILERPLATE_SELECTORS)
+    except Exception:
+        text = None
+    if not text or not text.strip():
+        text = page.text_content("body") or ""
+    return clean_text(text)
+
+
+def clip_item(item: Dict, max_chars: int = DEFAULT_ITEM_MAX_CHARS) -> Dict:
+    """Coupe le texte de l'item à `max_chars` caractères (marqué "truncated")."""
+    text = item.get("text")
+    if isinstance(text, str) and len(text) > max_chars:
+        return {**item, "text": text[:max_chars], "truncated": True, "text_length": len(text)}
+    return item
+
+
+class ResponseBudget:
+    """
+    Borne les items d'une réponse au moment de la servir : le texte de chaque item
+    est coupé à `max_item_chars` caractères, et les items sont refusés une fois
+    `max_bytes` octets de JSON atteints. Les coupes sont signalées dans stats().
+    """
+
+    def __init__(self, max_item_chars: Optional[int] = None, max_bytes: Optional[int] = None):
+        self.max_item_chars = max(0, DEFAULT_ITEM_MAX_CHARS if max_item_chars is None else max_item_chars)
+        self.max_bytes = max(0, DEFAULT_RESPONSE_MAX_BYTES if max_bytes is None else max_bytes)
+        self.used = 0
+        self.clipped = 0
+        self.dropped = 0
+
+    @staticmethod
+    def limits(data: Dict) -> Dict[str, int]:
+        """max_item_chars / max_bytes demandés par le client (ValueError si invalides)."""
+        limits = {}
+        for name in ("max_item_chars", "max_bytes"):
+            if data.get(name) is not None:
+                limits[name] = int(data[name])
+        return limits
+
+    @classmethod
+    def from_request(cls, data: Dict) -> Optional["ResponseBudget"]:
+        """Limites plus basses demandées par le client (max_item_chars, max_bytes), sinon None."""
+        limits = cls.limits(data)
+        if not limits:
+            return None
+        return cls(
+            min(limits["max_item_chars"], DEFAULT_ITEM_MAX_CHARS) if "max_item_chars" in limits else None,
+            min(limits["max_bytes"], DEFAULT_RESPONSE_MAX_BYTES) if "max_bytes" in limits else None,
+        )
+
+    def admit(self, item: Dict) -> Optional[Dict]:
+        """Renvoie l'item (éventuellement coupé) ou None s'il dépasse le budget."""
+        item = clip_item(item, self.max_item_chars)
+        if item.get("truncated"):
+            self.clipped += 1
+        size = len(json.dumps(item, ensure_ascii=False).encode("utf-8"))
+        if self.used + size > self.max_bytes:
+            self.dropped += 1
+            return None
+        self.used += size
+        return item
+
+    def fit(self, items: Iterable[Dict]) -> List[Dict]:
+        return [kept for kept in (self.admit(item) for item in items) if kept is not None]
+
+    @property
+    def exceeded(self) -> bool:
+        return bool(self.clipped or self.dropped)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "bytes": self.used,
+            "max_bytes": self.max_bytes,
+            "max_item_chars": self.max_item_chars,
+            "truncated_items": self.clipped,
+            "dropped_items": self.dropped,
+        }
+
+
+def _encoding_for(accept) -> Optional[str]:
+    """br si accepté et disponible, sinon gzip ; `accept` = request.accept_encodings."""
+    if brotli is not None and accept["br"]:
+        return "br"
+    if accept["gzip"]:
+        return "gzip"
+    return None
+
+
+def compress_response(response, accept):
+    """
+    Compresse une réponse JSON ou texte complète selon Accept-Encoding. Les flux
+    (NDJSON, SSE des jobs) ne sont pas touchés : ils sont envoyés au fil de l'eau.
+    """
+    if response.direct_passthrough or response.is_streamed or "Content-Encoding" in response.headers:
+        return response
+    if response.mimetype != "application/json" and not response.mimetype.startswith("text/"):
+        return response
+    response.vary.add("Accept-Encoding")
+    encoding = _encoding_for(accept)
+    data = response.get_data()
+    if encoding is None or len(data) < COMPRESS_MIN_BYTES:
+        return response
+    if encoding == "br":
+        response.set_data(brotli.compress(data, quality=4))
+    else:
+        response.set_data(gzip.compress(data, compresslevel=6))
+    response.headers["Content-Encoding"] = encoding
+    return response
@@ -0,0 +1,220 @@
+# Cache des résultats de scrape, clé = site + mot-clé normalisé + URLs + profondeur.
+#
+# Deux niveaux : un LRU en mémoire, et une base SQLite optionnelle (partagée entre
+# processus et conservée au redémarrage). Les requêtes identiques simultanées ne
+# déclenchent qu'un seul scrape ("single-flight"). Les identifiants ne font pas
+# partie de la clé : le même mot-clé renvoie le même résultat quel que soit le compte,
+# mais un résultat qui n'a pas été calculé pour l'appelant ne lui est servi qu'après
+# le contrôle `authorize` (compte vérifié, voir api_scraper._account_check).
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+
+def normalize_keyword(keyword: str) -> str:
+    """Minuscules, sans accents, espaces regroupés."""
+    folded = unicodedata.normalize("NFD", keyword or "").encode("ascii", "ignore").decode()
+    return " ".join(folded.lower().split())
+
+
+def make_key(site: str, keyword: str = "", urls: Iterable[str] = (), max_depth: int = 0) -> str:
+    payload = json.dumps(
+        {
+            "site": site,
+            "keyword": normalize_keyword(keyword),
+            "urls": sorted(set(urls or ())),
+            "max_depth": int(max_depth or 0),
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def is_cacheable(result: Dict[str, Any]) -> bool:
+    """On ne garde pas un résultat vide ou contenant des erreurs (connexion, navigation...)."""
+    items = result.get("items") or []
+    return bool(items) and not any(isinstance(i, dict) and i.get("error") for i in items)
+
+
+class ResultCache:
+    """
+    LRU en mémoire de `max_entries` résultats, doublé d'une base SQLite si
+    `sqlite_path` est donné. La durée de vie dépend du site (`ttls`, sinon `default_ttl`).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        default_ttl: float = 600.0,
+        ttls: Optional[Dict[str, float]] = None,
+        sqlite_path: Optional[str] = None,
+    ):
+        self.max_entries = max(1, max_entries)
+        self.default_ttl = default_ttl
+        self.ttls = dict(ttls or {})
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Tuple[float, float, Dict]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._counters = {"hits": 0, "sqlite_hits": 0, "misses": 0, "shared": 0, "stores": 0}
+        self._db: Optional[sqlite3.Connection] = None
+        if sqlite_path:
+            self._db = sqlite3.connect(sqlite_path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY, site TEXT, stored_at REAL, expires_at REAL, payload TEXT)"
+            )
+
+    @classmethod
+    def from_env(cls) -> "ResultCache":
+        ttls = {}
+        for site in ("droitdusport", "dalloz"):
+            value = os.environ.get(f"SCRAPER_CACHE_TTL_{site.upper()}")
+            if value:
+                ttls[site] = float(value)
+        return cls(
+            max_entries=int(os.environ.get("SCRAPER_CACHE_SIZE", "256")),
+            default_ttl=float(os.environ.get("SCRAPER_CACHE_TTL", "600")),
+            ttls=ttls,
+            sqlite_path=os.environ.get("SCRAPER_CACHE_DB") or None,
+        )
+
+    def ttl_for(self, site: str) -> float:
+        return self.ttls.get(site, self.default_ttl)
+
+    # --- lecture / écriture ---------------------------------------------------------
+
+    def _lookup(self, key: str) -> Optional[Tuple[float, Dict]]:
+        """Renvoie (stocké_le, résultat) ; à appeler avec le verrou."""
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            stored_at, expires_at, value = entry
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                self._counters["hits"] += 1
+                return stored_at, value
+            del self._memory[key]
+        if self._db is not None:
+            row = self._db.execute(
+                "SELECT stored_at, expires_at, payload FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                stored_at, expires_at, payload = row
+                if expires_at > now:
+                    value = json.loads(payload)
+                    self._remember(key, stored_at, expires_at, value)
+                    self._counters["sqlite_hits"] += 1
+                    return stored_at, value
+                self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+        return None
+
+    def _remember(self, key: str, stored_at: float, expires_at: float, value: Dict) -> None:
+        self._memory[key] = (stored_at, expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _store(self, site: str, key: str, value: Dict) -> None:
+        now = time.time()
+        expires_at = now + self.ttl_for(site)
+        with self._lock:
+            self._remember(key, now, expires_at, value)
+            self._counters["stores"] += 1
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (key, site, stored_at, expires_at, payload) VALUES (?, ?, ?, ?, ?)",
+                    (key, site, now, expires_at, json.dumps(value, ensure_ascii=False)),
+                )
+
+    def get(self, key: str) -> Optional[Tuple[Dict, float]]:
+        """Renvoie (résultat, âge en secondes) si la clé est en cache et valide."""
+        with self._lock:
+            found = self._lookup(key)
+            if found is None:
+                self._counters["misses"] += 1
+                return None
+        stored_at, value = found
+        return value, time.time() - stored_at
+
+    def put(self, site: str, key: str, value: Dict) -> bool:
+        """Stocke le résultat s'il est cacheable ; renvoie True s'il l'a été."""
+        if not is_cacheable(value):
+            return False
+        self._store(site, key, value)
+        return True
+
+    def get_or_compute(
+        self,
+        site: str,
+        key: str,
+        compute: Callable[[], Dict],
+        refresh: bool = False,
+        authorize: Optional[Callable[[], None]] = None,
+    ) -> Tuple[Dict, str, float]:
+        """
+        Renvoie (résultat, statut, âge en secondes). Statut : "hit" (cache), "shared"
+        (résultat d'un scrape identique déjà en cours) ou "miss" (scrape lancé ici).
+        `refresh` ignore le cache mais rejoint un scrape identique en cours.
+        `authorize` est appelé avant de servir un résultat "hit" ou "shared" et lève
+        une exception pour le refuser.
+        """
+        with self._lock:
+            found = None if refresh else self._lookup(key)
+            if found is None:
+                leader = key not in self._inflight
+                if leader:
+                    self._inflight[key] = Future()
+                    self._counters["misses"] += 1
+                else:
+                    self._counters["shared"] += 1
+                future = self._inflight[key]
+
+        if found is not None:
+            if authorize is not None:
+                authorize()
+            stored_at, value = found
+            return value, "hit", time.time() - stored_at
+
+        if not leader:
+            value = future.result()
+            if authorize is not None:
+                authorize()
+            return value, "shared", 0.0
+
+        try:
+            value = compute()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            if is_cacheable(value):
+                self._store(site, key, value)
+            future.set_result(value)
+            return value, "miss", 0.0
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            size = len(self._memory)
+            inflight = len(self._inflight)
+        lookups = counters["hits"] + counters["sqlite_hits"] + counters["misses"] + counters["shared"]
+        served = counters["hits"] + counters["sqlite_hits"] + counters["shared"]
+        return {
+            **counters,
+            "entries": size,
+            "inflight": inflight,
+            "hit_rate": round(served / lookups, 3) if lookups else None,
+            "sqlite": self._db is not None,
+        }
@@ -0,0 +1,138 @@
+# Cache des sessions authentifiées (cookies + storage_state Playwright).
+#
+# Une entrée par (site, compte), avec une durée de vie. Sur disque, les entrées sont
+# chiffrées (Fernet, module `cryptography`) avec la clé SCRAPER_SESSION_KEY ; sans clé
+# ou sans `cryptography`, le cache reste en mémoire : rien n'est écrit en clair.
+# Le mot de passe n'est jamais stocké, seulement une empreinte PBKDF2 salée qui
+# permet de refuser la session à un appel qui ne connaît pas le bon mot de passe.
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:
+    Fernet = None
+    InvalidToken = Exception
+
+_PBKDF2_ROUNDS = 100_000
+
+
+def _password_digest(password: str, salt: bytes) -> str:
+    return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, _PBKDF2_ROUNDS).hex()
+
+
+def _fernet_from_secret(secret: str):
+    """Accepte une clé Fernet ou une phrase secrète quelconque (dérivée en clé)."""
+    try:
+        return Fernet(secret.encode())
+    except ValueError:
+        key = base64.urlsafe_b64encode(hashlib.sha256(secret.encode("utf-8")).digest())
+        return Fernet(key)
+
+
+class SessionStore:
+    """storage_state Playwright mis en cache par site et par compte, avec TTL."""
+
+    def __init__(self, directory: Optional[Path] = None, ttl: float = 1800.0, secret: Optional[str] = None):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._memory: Dict[str, Dict[str, Any]] = {}
+        self._fernet = _fernet_from_secret(secret) if (secret and Fernet is not None) else None
+        self.directory = directory if self._fernet is not None else None
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True, mode=0o700)
+
+    @classmethod
+    def from_env(cls) -> "SessionStore":
+        directory = os.environ.get("SCRAPER_SESSION_DIR") or str(Path.home() / ".cache" / "scraper-sessions")
+        return cls(
+            directory=Path(directory),
+            ttl=float(os.environ.get("SCRAPER_SESSION_TTL", "1800")),
+            secret=os.environ.get("SCRAPER_SESSION_KEY"),
+        )
+
+    @staticmethod
+    def _key(site: str, username: str) -> str:
+        return hashlib.sha256(f"{site}\0{username}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Optional[Path]:
+        return self.directory / f"{key}.session" if self.directory is not None else None
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            return entry
+        path = self._path(key)
+        if path is None or not path.exists():
+            return None
+        try:
+            entry = json.loads(self._fernet.decrypt(path.read_bytes()))
+        except (InvalidToken, ValueError, OSError):
+            return None
+        self._memory[key] = entry
+        return entry
+
+    def get(self, site: str, username: str, password: str) -> Optional[Dict[str, Any]]:
+        """Renvoie {"state": ..., "meta": ...} si une session valide existe pour ce compte."""
+        key = self._key(site, username)
+        with self._lock:
+            entry = self._load(key)
+            if entry is None:
+                return None
+            if entry["expires_at"] < time.time():
+                self._drop(key)
+                return None
+        digest = _password_digest(password, bytes.fromhex(entry["salt"]))
+        if not hmac.compare_digest(digest, entry["password_digest"]):
+            return None
+        return {"state": entry["state"], "meta": entry.get("meta") or {}}
+
+    def put(
+        self,
+        site: str,
+        username: str,
+        password: str,
+        state: Dict[str, Any],
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        salt = os.urandom(16)
+        now = time.time()
+        entry = {
+            "created_at": now,
+            "expires_at": now + self.ttl,
+            "salt": salt.hex(),
+            "password_digest": _password_digest(password, salt),
+            "state": state,
+            "meta": meta or {},
+        }
+        key = self._key(site, username)
+        with self._lock:
+            self._memory[key] = entry
+            path = self._path(key)
+            if path is not None:
+                tmp = path.with_suffix(".tmp")
+                fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                with os.fdopen(fd, "wb") as fh:
+                    fh.write(self._fernet.encrypt(json.dumps(entry).encode("utf-8")))
+                os.replace(tmp, path)
+
+    def invalidate(self, site: str, username: str) -> None:
+        with self._lock:
+            self._drop(self._key(site, username))
+
+    def _drop(self, key: str) -> None:
+        self._memory.pop(key, None)
+        path = self._path(key)
+        if path is not None:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
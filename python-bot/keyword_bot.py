@@ -7,33 +7,141 @@ Usage rapide :
   python3 keyword_bot.py --sites sites.txt --keywords-file keywords.txt --json-output resultats.json
 
 Notes :
-- Pas de rendu JS (fetch HTML simple). Pour les sites full JS, ce bot ne verra rien.
-- On extrait le texte de la page, puis on cherche chaque mot-clé (accent-insensible).
+- Pas de rendu JS par défaut (fetch HTML simple). Avec --render, les pages dont le texte
+  est presque vide (moins de --render-min-words mots) sont rendues par un petit pool de
+  navigateurs headless, celui de python-api (Playwright requis) ; les autres restent en HTTP.
+- On extrait le texte de la page, puis on y cherche les mots-clés (accent-insensible ;
+  --whole-word pour les mots entiers) : str.find par mot-clé pour une liste courte, un
+  automate Aho-Corasick en une seule passe au-delà (pyahocorasick s'il est installé).
+- Les sites sont téléchargés en parallèle (--concurrency, --per-host) ; --sequential
+  conserve l'ancien parcours un par un pour comparaison.
+- Extraction du texte : selectolax (lexbor) ou lxml si installés, sinon un tokenizer
+  en flux sans arbre ; BeautifulSoup reste disponible (--extractor bs4) et sert de repli.
+- Les connexions HTTP sont réutilisées (keep-alive, gzip/brotli). Avec --validators-file,
+  les ETag / Last-Modified sont mémorisés avec les occurrences trouvées : une page inchangée
+  (304) n'est pas réanalysée, ses occurrences mémorisées sont ré-émises. La requête n'est
+  conditionnelle que si la page a déjà été analysée avec les mêmes mots-clés et options.
+- Accès réseau encadré par hôte : débit limité (seau à jetons, --rate / --burst), relances
+  avec attente exponentielle aléatoire sur 429/5xx (Retry-After respecté, --retries), et
+  disjoncteur (--breaker-file) qui écarte pendant un temps les hôtes en échec répété.
+- --workers N confie l'extraction du texte et la recherche des mots-clés à N processus
+  (l'automate est compilé une fois par processus) ; les threads ne font plus que le réseau.
+- Les résultats sont écrits site par site dès qu'ils sont trouvés (--ndjson-output pour
+  une occurrence JSON par ligne) ; la mémoire ne grossit pas avec le nombre de sites.
+- --since-last-run garde dans une base SQLite (--state-file) l'empreinte du texte de chaque
+  page et les occurrences déjà signalées : les pages au texte inchangé ne sont pas analysées
+  et seules les occurrences nouvelles (+) ou disparues (-) sont affichées.
+- sites.json est compilé en un registre binaire mis en cache (voir site_registry.py) :
+  URLs canonisées, index par catégorie et regroupement par hôte ne sont recalculés que
+  si le fichier change.
 """
 import argparse
+import bisect
+import email.utils
+import functools
+import hashlib
+import heapq
 import json
+import multiprocessing
+import os
+import random
 import re
+import sqlite3
+import string
 import sys
+import time
+import threading
 import unicodedata
-from dataclasses import dataclass
+from array import array
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from html.parser import HTMLParser
 from pathlib import Path
-from typing import List, Dict, Iterable, Set
+from typing import Callable, List, Dict, IO, Iterable, Iterator, Optional, Set, Tuple, Union
+from urllib.parse import urlparse
 
 import requests
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+
+from site_registry import SiteRegistry
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    import lxml.html
+    import lxml.etree
+except ImportError:
+    lxml = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:  # urllib3 ne décode "br" que si un module brotli est installé
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = "gzip, deflate, br"
+    except ImportError:
+        ACCEPT_ENCODING = "gzip, deflate"
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_PER_HOST = 2
+MAX_OCCURRENCES_PER_PAGE = 5  # par mot-clé et par page
+# En dessous, un str.find par mot-clé bat l'automate Aho-Corasick en Python
+# (mesuré sur une page de 250 Ko : 4 ms contre 45 ms pour 5 mots-clés, égalité vers 150-200)
+FIND_MAX_PATTERNS = 150
+DEFAULT_STATE_FILE = ".keyword_bot_state.sqlite"
+DEFAULT_RENDER_MIN_WORDS = 30
+DEFAULT_RENDER_POOL = 2
+API_DIR = Path(__file__).resolve().parent.parent / "python-api"
+DEFAULT_RATE = 2.0  # requêtes / s par hôte
+DEFAULT_RETRIES = 2
+CONNECT_TIMEOUT = 5
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
 
 DEFAULT_HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
     "Accept-Language": "fr-FR,fr;q=0.9,en-US;q=0.8,en;q=0.7",
+    "Accept-Encoding": ACCEPT_ENCODING,
 }
 
 
-@dataclass
 class Occurrence:
-    url: str
-    keyword: str
-    snippet: str
+    """Une occurrence trouvée ; `__slots__` pour ne pas payer un dict par occurrence."""
+
+    __slots__ = ("url", "keyword", "snippet", "change")
+
+    def __init__(self, url: str, keyword: str, snippet: str, change: Optional[str] = None):
+        self.url = url
+        self.keyword = keyword
+        self.snippet = snippet
+        self.change = change  # "new" / "removed" en mode --since-last-run
+
+    def __repr__(self) -> str:
+        return f"Occurrence(url={self.url!r}, keyword={self.keyword!r}, snippet={self.snippet!r}, change={self.change!r})"
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Occurrence):
+            return NotImplemented
+        return (self.url, self.keyword, self.snippet, self.change) == (
+            other.url, other.keyword, other.snippet, other.change
+        )
+
+    def to_dict(self) -> Dict[str, str]:
+        data = {"url": self.url, "keyword": self.keyword, "snippet": self.snippet}
+        if self.change:
+            data["change"] = self.change
+        return data
 
 
 def normalize(text: str) -> str:
@@ -45,42 +153,516 @@ def normalize(text: str) -> str:
     )
 
 
-def clean_url(url: str) -> str:
-  return url.split(" ")[0].split("(")[0].strip()
+@functools.lru_cache(maxsize=4096)
+def _fold_char(ch: str) -> str:
+    return unicodedata.normalize("NFD", ch).encode("ascii", "ignore").decode().lower()
+
 
+class NormalizedText:
+    """
+    Texte normalisé comme `normalize`, avec la correspondance vers le texte brut.
 
-def load_list_from_file(path: Path, categories: Set[str]) -> List[str]:
+    La plupart des caractères se replient sur un seul (texte ASCII, é → e) : la
+    correspondance est alors l'identité. Seuls les caractères qui disparaissent
+    (’, «, œ...) ou s'allongent (ǅ → dz) la décalent ; on ne garde qu'un point de
+    rupture après chacun d'eux. `starts[b]` est une position dans `norm` et
+    `raw_at[b]` la position correspondante dans `raw`, les caractères suivants
+    se correspondant un à un jusqu'au point suivant. Sans rupture, les deux valent None.
+    """
+
+    __slots__ = ("raw", "norm", "starts", "raw_at")
+
+    def __init__(self, raw: str, norm: str, starts: Optional[array] = None, raw_at: Optional[array] = None):
+        self.raw = raw
+        self.norm = norm
+        self.starts = starts
+        self.raw_at = raw_at
+
+    def raw_pos(self, pos: int) -> int:
+        """Position dans `raw` du caractère `norm[pos]` (len(raw) pour pos == len(norm))."""
+        if self.starts is None:
+            return pos
+        b = bisect.bisect_right(self.starts, pos) - 1
+        if b < 0:
+            return pos
+        return self.raw_at[b] + pos - self.starts[b]
+
+    def raw_span(self, start: int, end: int) -> Tuple[int, int]:
+        return self.raw_pos(start), self.raw_pos(end)
+
+
+def normalize_with_offsets(text: str) -> NormalizedText:
+    """
+    Normalise avec `normalize` (en C d'un bout à l'autre), puis ne parcourt que les
+    caractères qui ne se replient pas sur exactement un caractère ASCII pour poser
+    les points de rupture ; sur une page sans eux, aucune correspondance n'est construite.
+    """
+    text = text or ""
+    if text.isascii():
+        return NormalizedText(text, text.lower())
+    uneven: Dict[str, int] = {}
+    for ch in set(text):
+        if ch > "\x7f":
+            folded = _fold_char(ch)
+            if len(folded) != 1:
+                uneven[ch] = len(folded)
+    norm = normalize(text)
+    if not uneven:
+        return NormalizedText(text, norm)
+    starts = array("I")
+    raw_at = array("I")
+    shift = 0  # len(norm) - len(raw) jusqu'ici
+    for m in re.finditer("[" + re.escape("".join(sorted(uneven))) + "]", text):
+        i = m.start()
+        length = uneven[text[i]]
+        for n in range(length):  # chaque caractère du repli renvoie au caractère brut
+            starts.append(i + shift + n)
+            raw_at.append(i)
+        shift += length - 1
+        starts.append(i + 1 + shift)
+        raw_at.append(i + 1)
+    return NormalizedText(text, norm, starts, raw_at)
+
+
+# Une page est normalisée une seule fois, même si plusieurs jeux de mots-clés l'analysent
+normalized_page = functools.lru_cache(maxsize=16)(normalize_with_offsets)
+
+
+def load_list_from_file(path: Path, categories: Optional[Set[str]] = None) -> List[str]:
   if not path.exists():
     raise FileNotFoundError(f"Fichier introuvable : {path}")
 
-  # Support JSON (sites.json) or simple text
+  # sites.json : registre compilé et mis en cache (voir site_registry.py)
   if path.suffix.lower() == ".json":
-    try:
-      data = json.loads(path.read_text())
-    except Exception as e:
-      raise ValueError(f"Impossible de lire le JSON {path}: {e}")
-
-    urls: List[str] = []
-    for item in data:
-      url = clean_url(str(item.get("URL", "")))
-      if not url:
-        continue
-      if categories:
-        cat = str(item.get("CATEGORIES", "")).lower()
-        if not any(c in cat for c in categories):
-          continue
-      urls.append(url)
-    return urls
+    return SiteRegistry.load(path).urls(categories)
 
+  # Texte simple (liste de sites ou de mots-clés) : une entrée par ligne
+  if categories:
+    raise ValueError(f"Filtre par catégories impossible : {path} est une liste texte sans catégories")
   return [line.strip() for line in path.read_text().splitlines() if line.strip()]
 
 
-def fetch_text(url: str, timeout: int = 15) -> str:
-    resp = requests.get(url, headers=DEFAULT_HEADERS, timeout=timeout)
+def make_session(hosts: int = 10, per_host: int = DEFAULT_PER_HOST) -> requests.Session:
+    """Session partagée : une file de connexions keep-alive par hôte."""
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    # pool_connections = nombre d'hôtes gardés ouverts, pool_maxsize = connexions par hôte
+    adapter = HTTPAdapter(pool_connections=max(1, hosts), pool_maxsize=max(1, per_host))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def response_validators(resp: requests.Response) -> Dict[str, str]:
+    """ETag / Last-Modified de la réponse (chaînes vides si absents)."""
+    return {"etag": resp.headers.get("ETag") or "", "last_modified": resp.headers.get("Last-Modified") or ""}
+
+
+def conditional_headers(etag: Optional[str], last_modified: Optional[str]) -> Dict[str, str]:
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+class ValidatorStore:
+    """
+    Mémorise par URL l'ETag / Last-Modified de la page avec les occurrences qu'on y a
+    trouvées, dans un petit fichier JSON. La requête n'est conditionnelle que si ces
+    occurrences ont été calculées avec les mots-clés et options actuels (`fingerprint`,
+    voir KeywordMatcher.fingerprint) : sur un 304, elles sont ré-émises telles quelles.
+    """
+
+    def __init__(self, path: Path, fingerprint: str = ""):
+        self.path = path
+        self.fingerprint = fingerprint
+        self._lock = threading.Lock()
+        self._data: Dict[str, Dict] = {}
+        if path.exists():
+            try:
+                self._data = json.loads(path.read_text())
+            except Exception as e:
+                print(f"[WARN] Validateurs illisibles ({path}): {e}", file=sys.stderr)
+
+    def _entry(self, url: str) -> Optional[Dict]:
+        """Entrée de l'URL si elle a été analysée avec les mots-clés actuels ; à appeler avec le verrou."""
+        entry = self._data.get(url)
+        if not isinstance(entry, dict) or entry.get("fingerprint") != self.fingerprint:
+            return None
+        if not isinstance(entry.get("occurrences"), list):
+            return None
+        return entry
+
+    def headers_for(self, url: str) -> Dict[str, str]:
+        with self._lock:
+            entry = self._entry(url) or {}
+        return conditional_headers(entry.get("etag"), entry.get("last_modified"))
+
+    def stored(self, url: str) -> Optional[List[Occurrence]]:
+        """Occurrences mémorisées pour l'URL (celles à ré-émettre sur un 304)."""
+        with self._lock:
+            entry = self._entry(url)
+        if entry is None:
+            return None
+        return [Occurrence(url, kw, snippet) for kw, snippet in entry["occurrences"]]
+
+    def update(self, url: str, validators: Dict[str, str], occs: List[Occurrence]) -> None:
+        """À appeler une fois la page analysée : validateurs de la réponse et occurrences trouvées."""
+        with self._lock:
+            if validators.get("etag") or validators.get("last_modified"):
+                self._data[url] = {
+                    **validators,
+                    "fingerprint": self.fingerprint,
+                    "occurrences": [[o.keyword, o.snippet] for o in occs],
+                }
+            else:
+                self._data.pop(url, None)
+
+    def save(self) -> None:
+        with self._lock:
+            payload = json.dumps(self._data, ensure_ascii=False)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(payload)
+        os.replace(tmp, self.path)
+
+
+class StateStore:
+    """
+    État du mode --since-last-run dans une base SQLite : empreinte du texte de chaque
+    page, ETag / Last-Modified de la réponse analysée, et occurrences déjà signalées.
+    Si la liste de mots-clés a changé depuis le dernier passage (`fingerprint`), les
+    pages sont oubliées (requêtes à nouveau inconditionnelles) et toutes sont
+    réanalysées ; les occurrences signalées sont conservées pour le calcul des
+    écarts, sauf celles des mots-clés qui ne font plus partie de `keywords`.
+    """
+
+    def __init__(self, path: Path, fingerprint: str = "", keywords: Optional[Iterable[str]] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " url TEXT PRIMARY KEY, content_hash TEXT, checked_at REAL, etag TEXT, last_modified TEXT)"
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(pages)")}
+        for column in ("etag", "last_modified"):
+            if column not in columns:  # base créée avant les validateurs
+                self._db.execute(f"ALTER TABLE pages ADD COLUMN {column} TEXT")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS occurrences ("
+            " url TEXT, keyword TEXT, snippet TEXT, reported_at REAL, PRIMARY KEY (url, keyword, snippet))"
+        )
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+        if row is None or row[0] != fingerprint:
+            with self._transaction():
+                self._db.execute("DELETE FROM pages")
+                if keywords is not None:
+                    kept = sorted(set(keywords))
+                    self._db.execute(
+                        f"DELETE FROM occurrences WHERE keyword NOT IN ({', '.join('?' * len(kept))})", kept
+                    )
+                self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('fingerprint', ?)", (fingerprint,))
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """
+        Transaction explicite : la connexion est en autocommit (isolation_level=None),
+        où `with self._db` ne regroupe rien. Tout ou rien en cas d'arrêt en cours d'écriture.
+        """
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        else:
+            self._db.execute("COMMIT")
+
+    @staticmethod
+    def digest(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def known_hash(self, url: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT content_hash FROM pages WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def headers_for(self, url: str) -> Dict[str, str]:
+        """En-têtes conditionnels de la page, si elle a été analysée avec les mots-clés actuels."""
+        with self._lock:
+            row = self._db.execute("SELECT etag, last_modified FROM pages WHERE url = ?", (url,)).fetchone()
+        return conditional_headers(*row) if row else {}
+
+    def touch(self, url: str, validators: Optional[Dict[str, str]] = None) -> None:
+        with self._lock:
+            if validators is None:
+                self._db.execute("UPDATE pages SET checked_at = ? WHERE url = ?", (time.time(), url))
+            else:
+                self._db.execute(
+                    "UPDATE pages SET checked_at = ?, etag = ?, last_modified = ? WHERE url = ?",
+                    (time.time(), validators.get("etag"), validators.get("last_modified"), url),
+                )
+
+    def is_unchanged(self, url: str, content_hash: str, validators: Optional[Dict[str, str]] = None) -> bool:
+        if self.known_hash(url) != content_hash:
+            return False
+        self.touch(url, validators)
+        return True
+
+    def record(
+        self, url: str, content_hash: str, occs: List[Occurrence], validators: Optional[Dict[str, str]] = None
+    ) -> List[Occurrence]:
+        """
+        Enregistre l'état de la page (avec les validateurs de la réponse analysée) et
+        renvoie les occurrences nouvelles puis disparues.
+        """
+        now = time.time()
+        current = {(o.keyword, o.snippet): o for o in occs}
+        with self._lock, self._transaction():
+            known = {
+                (kw, snippet)
+                for kw, snippet in self._db.execute(
+                    "SELECT keyword, snippet FROM occurrences WHERE url = ?", (url,)
+                )
+            }
+            added = [k for k in current if k not in known]
+            removed = [k for k in known if k not in current]
+            self._db.executemany(
+                "INSERT INTO occurrences (url, keyword, snippet, reported_at) VALUES (?, ?, ?, ?)",
+                [(url, kw, snippet, now) for kw, snippet in added],
+            )
+            self._db.executemany(
+                "DELETE FROM occurrences WHERE url = ? AND keyword = ? AND snippet = ?",
+                [(url, kw, snippet) for kw, snippet in removed],
+            )
+            validators = validators or {}
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages (url, content_hash, checked_at, etag, last_modified)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (url, content_hash, now, validators.get("etag"), validators.get("last_modified")),
+            )
+        changes = [Occurrence(url, kw, snippet, "new") for kw, snippet in added]
+        changes.extend(Occurrence(url, kw, snippet, "removed") for kw, snippet in sorted(removed))
+        return changes
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class HostUnavailable(requests.RequestException):
+    """Hôte écarté par le disjoncteur : la page n'est pas demandée."""
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur par hôte : après `threshold` échecs consécutifs (erreur réseau, 5xx,
+    429 persistant), l'hôte est écarté pendant `cooldown` secondes, puis une seule
+    tentative est autorisée ; un nouvel échec le rouvre aussitôt. Avec `path`, l'état
+    est gardé dans un fichier JSON d'un passage à l'autre.
+    """
+
+    def __init__(self, path: Optional[Path] = None, threshold: int = 3, cooldown: float = 3600.0):
+        self.path = path
+        self.threshold = max(1, threshold)
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, Dict[str, float]] = {}
+        self._probing: Set[str] = set()
+        if path and path.exists():
+            try:
+                self._hosts = json.loads(path.read_text())
+            except Exception as e:
+                print(f"[WARN] État du disjoncteur illisible ({path}): {e}", file=sys.stderr)
+
+    def check(self, host: str) -> None:
+        """Lève HostUnavailable si l'hôte est écarté."""
+        with self._lock:
+            entry = self._hosts.get(host)
+            if not entry or entry.get("failures", 0) < self.threshold:
+                return
+            until = entry.get("open_until", 0.0)
+            if time.time() < until or host in self._probing:
+                raise HostUnavailable(
+                    f"hôte écarté après {int(entry['failures'])} échecs, "
+                    f"jusqu'à {time.strftime('%H:%M', time.localtime(until))}"
+                )
+            self._probing.add(host)  # délai écoulé : une seule tentative de test
+
+    def record_success(self, host: str) -> None:
+        with self._lock:
+            self._probing.discard(host)
+            self._hosts.pop(host, None)
+
+    def record_failure(self, host: str) -> None:
+        with self._lock:
+            self._probing.discard(host)
+            entry = self._hosts.setdefault(host, {"failures": 0, "open_until": 0.0})
+            entry["failures"] += 1
+            if entry["failures"] >= self.threshold:
+                entry["open_until"] = time.time() + self.cooldown
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            payload = json.dumps(self._hosts)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(payload)
+        os.replace(tmp, self.path)
+
+
+class FetchPolicy:
+    """
+    Règles d'accès par hôte : seau à jetons de `rate` requêtes/s (rafales de `burst`),
+    `retries` relances sur 429/5xx avec attente exponentielle aléatoire (ou Retry-After
+    s'il ne dépasse pas `max_retry_after`), et disjoncteur optionnel.
+    """
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        burst: int = DEFAULT_PER_HOST,
+        retries: int = DEFAULT_RETRIES,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        max_retry_after: float = 60.0,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.retries = max(0, retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+        self.breaker = breaker
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    def acquire(self, host: str) -> None:
+        """Prend un jeton pour `host`, en attendant si le seau est vide."""
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            tokens, last = self._buckets.get(host, (float(self.burst), now))
+            tokens = min(float(self.burst), tokens + (now - last) * self.rate) - 1.0
+            self._buckets[host] = (tokens, now)
+        if tokens < 0:
+            time.sleep(-tokens / self.rate)
+
+    def retry_delay(self, attempt: int, retry_after: Optional[str]) -> Optional[float]:
+        """Attente avant la relance n° `attempt` (0 = première), None pour abandonner."""
+        if attempt >= self.retries:
+            return None
+        if retry_after:
+            delay = _parse_retry_after(retry_after)
+            if delay is not None:
+                return delay if delay <= self.max_retry_after else None
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+
+def _parse_retry_after(value: str) -> Optional[float]:
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def _get(url: str, headers: Dict[str, str], timeout: int, session: Optional[requests.Session]) -> requests.Response:
+    timeouts = (min(CONNECT_TIMEOUT, timeout), timeout)
+    if session is None:
+        return requests.get(url, headers={**DEFAULT_HEADERS, **headers}, timeout=timeouts)
+    return session.get(url, headers=headers, timeout=timeouts)
+
+
+def fetch_page(
+    url: str,
+    timeout: int = 15,
+    session: Optional[requests.Session] = None,
+    headers: Optional[Dict[str, str]] = None,
+    policy: Optional[FetchPolicy] = None,
+) -> Tuple[Optional[str], Dict[str, str]]:
+    """
+    Télécharge la page, avec les en-têtes conditionnels `headers` s'il y en a.
+    Renvoie (html, validateurs de la réponse) ; html vaut None sur un 304.
+    """
+    headers = headers or {}
+    if policy is None:
+        resp = _get(url, headers, timeout, session)
+    else:
+        resp = _get_with_policy(url, headers, timeout, session, policy)
+    if resp.status_code == 304 and headers:
+        return None, {}
     resp.raise_for_status()
-    soup = BeautifulSoup(resp.text, "html.parser")
+    return resp.text, response_validators(resp)
+
+
+def fetch_html(
+    url: str,
+    timeout: int = 15,
+    session: Optional[requests.Session] = None,
+    policy: Optional[FetchPolicy] = None,
+) -> str:
+    return fetch_page(url, timeout=timeout, session=session, policy=policy)[0]
+
+
+def _get_with_policy(
+    url: str,
+    headers: Dict[str, str],
+    timeout: int,
+    session: Optional[requests.Session],
+    policy: FetchPolicy,
+) -> requests.Response:
+    host = host_of(url)
+    breaker = policy.breaker
+    if breaker:
+        breaker.check(host)
+    attempt = 0
+    while True:
+        policy.acquire(host)
+        try:
+            resp = _get(url, headers, timeout, session)
+        except requests.RequestException:
+            if breaker:
+                breaker.record_failure(host)
+            raise
+        if resp.status_code not in RETRY_STATUSES:
+            break
+        delay = policy.retry_delay(attempt, resp.headers.get("Retry-After"))
+        if delay is None:
+            break
+        resp.close()
+        time.sleep(delay)
+        attempt += 1
+    if breaker:
+        if resp.status_code in RETRY_STATUSES:
+            breaker.record_failure(host)
+        else:
+            breaker.record_success(host)
+    return resp
+
+
+SKIPPED_TAGS = ("script", "style", "noscript")
+
+
+def _collapse(text: str) -> str:
+    # Équivalent de re.sub(r"\s+", " ", ...).strip(), sans regex
+    return " ".join(text.split())
+
+
+def _extract_bs4(html: str) -> str:
+    soup = BeautifulSoup(html, "html.parser")
     # Retirer scripts/styles
-    for tag in soup(["script", "style", "noscript"]):
+    for tag in soup(list(SKIPPED_TAGS)):
         tag.decompose()
     text = soup.get_text(separator=" ", strip=True)
     # Nettoyage basique
@@ -88,63 +670,773 @@ def fetch_text(url: str, timeout: int = 15) -> str:
     return text
 
 
-def find_occurrences(text: str, url: str, keywords: Iterable[str], max_len: int = 240) -> List[Occurrence]:
-    norm_text = normalize(text)
+def _extract_selectolax(html: str) -> str:
+    tree = LexborHTMLParser(html)
+    tree.strip_tags(list(SKIPPED_TAGS))
+    root = tree.root
+    return _collapse(root.text(separator=" ", strip=True)) if root is not None else ""
+
+
+def _extract_lxml(html: str) -> str:
+    if not html.strip():
+        return ""
+    parser = lxml.html.HTMLParser(encoding="utf-8")
+    doc = lxml.html.document_fromstring(html.encode("utf-8", "replace"), parser=parser)
+    lxml.etree.strip_elements(doc, *SKIPPED_TAGS, with_tail=False)
+    return _collapse(" ".join(doc.itertext()))
+
+
+class _TextTokenizer(HTMLParser):
+    """Parcourt le HTML en flux et ne garde que le texte hors script/style/noscript."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self._skip += 1
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS and self._skip:
+            self._skip -= 1
+
+    def handle_data(self, data):
+        if not self._skip:
+            self.parts.append(data)
+
+
+def _extract_stream(html: str) -> str:
+    tokenizer = _TextTokenizer()
+    tokenizer.feed(html)
+    tokenizer.close()
+    return _collapse(" ".join(tokenizer.parts))
+
+
+EXTRACTORS: Dict[str, Callable[[str], str]] = {"stream": _extract_stream, "bs4": _extract_bs4}
+if lxml is not None:
+    EXTRACTORS["lxml"] = _extract_lxml
+if LexborHTMLParser is not None:
+    EXTRACTORS["selectolax"] = _extract_selectolax
+
+# Ordre de préférence pour le backend par défaut
+_EXTRACTOR_PREFERENCE = ("selectolax", "lxml", "stream")
+DEFAULT_EXTRACTOR = next(name for name in _EXTRACTOR_PREFERENCE if name in EXTRACTORS)
+
+
+def html_to_text(html: str, extractor: Optional[str] = None) -> str:
+    """Extrait le texte visible ; repli sur BeautifulSoup si le backend échoue."""
+    name = extractor or DEFAULT_EXTRACTOR
+    if name not in EXTRACTORS:
+        raise ValueError(f"Extracteur inconnu ou non installé : {name} (disponibles : {', '.join(sorted(EXTRACTORS))})")
+    try:
+        return EXTRACTORS[name](html)
+    except Exception:
+        if name == "bs4":
+            raise
+        return _extract_bs4(html)
+
+
+def fetch_text(
+    url: str,
+    timeout: int = 15,
+    session: Optional[requests.Session] = None,
+    extractor: Optional[str] = None,
+    policy: Optional[FetchPolicy] = None,
+) -> str:
+    return html_to_text(fetch_html(url, timeout=timeout, session=session, policy=policy), extractor)
+
+
+def _render_in_context(context, url: str, timeout_ms: int) -> str:
+    from lean import LeanLoader  # noqa: E402 (python-api, chargé par Renderer)
+
+    loader = LeanLoader(selector_timeout_ms=timeout_ms)
+    loader.attach(context)
+    page = context.new_page()
+    page.set_default_timeout(timeout_ms)
+    page.goto(url, wait_until="domcontentloaded")
+    loader.wait_ready(page)
+    try:  # laisser le JS finir ses appels ; une page qui ne se calme jamais est prise telle quelle
+        page.wait_for_load_state("networkidle", timeout=min(timeout_ms, 5000))
+    except Exception:
+        pass
+    return page.content()
+
+
+class Renderer:
+    """
+    Rendu headless des pages dont le texte "HTTP simple" est presque vide. Réutilise
+    le BrowserPool (et le blocage des ressources de LeanLoader) de python-api ; les
+    navigateurs ne sont lancés qu'au premier rendu demandé.
+    """
+
+    def __init__(self, size: int = DEFAULT_RENDER_POOL, min_words: int = DEFAULT_RENDER_MIN_WORDS, timeout: int = 30):
+        if str(API_DIR) not in sys.path:
+            sys.path.insert(0, str(API_DIR))
+        try:
+            from browser_pool import BrowserPool
+        except ImportError as e:
+            raise RuntimeError(f"--render nécessite Playwright (pip install playwright && playwright install chromium) : {e}")
+        self.min_words = min_words
+        self.timeout = timeout
+        self.rendered = 0
+        self._pool_cls = BrowserPool
+        self._size = size
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def wants(self, word_count: int) -> bool:
+        return word_count < self.min_words
+
+    def render(self, url: str) -> str:
+        with self._lock:
+            if self._pool is None:
+                self._pool = self._pool_cls(size=self._size, headless=True, lease_timeout=self.timeout * 10)
+            self.rendered += 1
+        return self._pool.run(functools.partial(_render_in_context, url=url, timeout_ms=self.timeout * 1000))
+
+    def close(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.close()
+
+
+_WORD_CHARS = frozenset(string.ascii_lowercase + string.digits)
+
+
+class KeywordMatcher:
+    """
+    Recherche des mots-clés normalisés, construite une fois par exécution.
+
+    Selon le nombre de motifs (`backend`) : un `str.find` par motif en dessous de
+    FIND_MAX_PATTERNS, sinon un automate Aho-Corasick qui trouve tous les motifs en
+    un seul parcours du texte, celui de pyahocorasick (C) s'il est installé, sinon
+    celui de cette classe. Comme l'ancienne boucle `str.find`, les occurrences d'un
+    même mot-clé ne se chevauchent pas ; les trois variantes donnent le même résultat.
+    """
+
+    def __init__(self, keywords: Iterable[str], whole_word: bool = False):
+        self.whole_word = whole_word
+        by_pattern: Dict[str, List[str]] = {}
+        for kw in keywords:
+            norm_kw = normalize(kw)
+            if norm_kw:
+                by_pattern.setdefault(norm_kw, []).append(kw)
+        # Un motif normalisé peut correspondre à plusieurs mots-clés d'origine ("CDD", "cdd")
+        self.patterns: List[str] = list(by_pattern)
+        self.keywords: List[Tuple[str, ...]] = [tuple(kws) for kws in by_pattern.values()]
+        self._lengths: List[int] = [len(p) for p in self.patterns]
+
+        if len(self.patterns) < FIND_MAX_PATTERNS:
+            self.backend = "find"
+        elif ahocorasick is not None:
+            self.backend = "pyahocorasick"
+            self._automaton = ahocorasick.Automaton()
+            for pid, pattern in enumerate(self.patterns):
+                self._automaton.add_word(pattern, pid)
+            self._automaton.make_automaton()
+        else:
+            self.backend = "aho-corasick"
+            self._build_automaton()
+
+    def _build_automaton(self) -> None:
+        goto: List[Dict[str, int]] = [{}]
+        out: List[Tuple[int, ...]] = [()]
+        for pid, pattern in enumerate(self.patterns):
+            state = 0
+            for ch in pattern:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto.append({})
+                    out.append(())
+                    goto[state][ch] = nxt
+                state = nxt
+            out[state] += (pid,)
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                out[nxt] += out[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def fingerprint(self) -> str:
+        """Empreinte des mots-clés et options : une autre liste invalide l'état incrémental."""
+        payload = json.dumps(
+            [self.whole_word, "per-keyword", MAX_OCCURRENCES_PER_PAGE, sorted(zip(self.patterns, self.keywords))],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _is_word(self, norm_text: str, start: int, end: int) -> bool:
+        return not (
+            (start > 0 and norm_text[start - 1] in _WORD_CHARS)
+            or (end < len(norm_text) and norm_text[end] in _WORD_CHARS)
+        )
+
+    def iter_matches(self, norm_text: str, limit: Optional[int] = None) -> Iterator[Tuple[int, int, int]]:
+        """
+        Génère (début, fin, indice du motif) dans l'ordre des positions de fin, au
+        plus `limit` occurrences par motif.
+        """
+        if not self.patterns or limit == 0:
+            return iter(())
+        if self.backend == "find":
+            scans = [self._find_all(norm_text, pid, limit) for pid in range(len(self.patterns))]
+            return ((start, end, pid) for end, start, pid in heapq.merge(*scans))
+        if self.backend == "pyahocorasick":
+            candidates = (
+                (end + 1 - self._lengths[pid], end + 1, pid) for end, pid in self._automaton.iter(norm_text)
+            )
+        else:
+            candidates = self._automaton_candidates(norm_text)
+        return self._select(norm_text, candidates, limit)
+
+    def _find_all(self, norm_text: str, pid: int, limit: Optional[int]) -> Iterator[Tuple[int, int, int]]:
+        """(fin, début, motif) des occurrences d'un motif, sans chevauchement."""
+        pattern = self.patterns[pid]
+        length = self._lengths[pid]
+        whole_word = self.whole_word
+        found = 0
+        idx = norm_text.find(pattern)
+        while idx != -1:
+            end = idx + length
+            if whole_word and not self._is_word(norm_text, idx, end):
+                idx = norm_text.find(pattern, idx + 1)
+                continue
+            yield end, idx, pid
+            found += 1
+            if found == limit:
+                return
+            idx = norm_text.find(pattern, end)
+
+    def _automaton_candidates(self, norm_text: str) -> Iterator[Tuple[int, int, int]]:
+        """Toutes les occurrences (chevauchantes comprises) trouvées par l'automate Python."""
+        goto, fail, out, lengths = self._goto, self._fail, self._out, self._lengths
+        state = 0
+        for i, ch in enumerate(norm_text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not out[state]:
+                continue
+            end = i + 1
+            for pid in out[state]:
+                yield end - lengths[pid], end, pid
+
+    def _select(
+        self, norm_text: str, candidates: Iterator[Tuple[int, int, int]], limit: Optional[int]
+    ) -> Iterator[Tuple[int, int, int]]:
+        """Écarte les chevauchements d'un même motif et les mots partiels ; s'arrête quand tous les motifs sont au plafond."""
+        whole_word = self.whole_word
+        last_end: Dict[int, int] = {}
+        counts: Dict[int, int] = {}
+        capped = 0
+        for start, end, pid in candidates:
+            if start < last_end.get(pid, 0) or counts.get(pid, 0) == limit:
+                continue
+            if whole_word and not self._is_word(norm_text, start, end):
+                continue
+            last_end[pid] = end
+            yield start, end, pid
+            if limit is not None:
+                counts[pid] = counts.get(pid, 0) + 1
+                if counts[pid] == limit:
+                    capped += 1
+                    if capped == len(self.patterns):
+                        return
+
+
+def find_occurrences(
+    text: str,
+    url: str,
+    keywords: Union[Iterable[str], KeywordMatcher],
+    max_len: int = 240,
+    max_per_page: int = MAX_OCCURRENCES_PER_PAGE,
+) -> List[Occurrence]:
+    """
+    Occurrences des mots-clés dans `text`, dans l'ordre de la page. Au plus
+    `max_per_page` occurrences par mot-clé : un terme fréquent ne masque pas les autres.
+    """
+    matcher = keywords if isinstance(keywords, KeywordMatcher) else KeywordMatcher(keywords)
     occs: List[Occurrence] = []
-    for kw in keywords:
-        norm_kw = normalize(kw)
-        if not norm_kw:
-            continue
-        start = 0
-        found = False
-        while True:
-            idx = norm_text.find(norm_kw, start)
-            if idx == -1:
-                break
-            found = True
-            # Construire un snippet autour de l'occurrence
-            raw_start = max(0, idx - 120)
-            raw_end = min(len(text), idx + len(kw) + 120)
+    if not len(matcher):
+        return occs
+    counts: Dict[str, int] = {}
+    remaining = sum(len(kws) for kws in matcher.keywords)  # mots-clés pas encore au plafond
+    page = normalized_page(text)
+    for idx, end, pid in matcher.iter_matches(page.norm, max_per_page):
+        match_start, match_end = page.raw_span(idx, end)
+        for kw in matcher.keywords[pid]:
+            if counts.get(kw, 0) >= max_per_page:
+                continue
+            # Construire un snippet autour de l'occurrence, dans le texte d'origine
+            raw_start = max(0, match_start - 120)
+            raw_end = min(len(text), match_end + 120)
             snippet = text[raw_start:raw_end].strip()
             if len(snippet) > max_len:
                 snippet = snippet[:max_len] + "..."
             occs.append(Occurrence(url=url, keyword=kw, snippet=snippet))
-            start = idx + len(norm_kw)
-            if len(occs) >= 5:  # limiter les occurrences par page
-                break
-        if found:
-            continue
+            counts[kw] = counts.get(kw, 0) + 1
+            if counts[kw] == max_per_page:
+                remaining -= 1
+                if not remaining:  # tous les mots-clés au plafond : inutile de lire la suite
+                    return occs
     return occs
 
 
-def scrape_sites(sites: List[str], keywords: List[str], timeout: int = 15) -> Dict[str, List[Occurrence]]:
-    results: Dict[str, List[Occurrence]] = {}
+def host_of(url: str) -> str:
+    return (urlparse(url).hostname or "").lower()
+
+
+# --- Étage CPU en processus séparés (--workers) -------------------------------------
+
+_worker_matcher: Optional[KeywordMatcher] = None
+_worker_extractor: Optional[str] = None
+
+
+def _init_worker(keywords: List[str], whole_word: bool, extractor: Optional[str]) -> None:
+    """Initialisation d'un processus du pool : l'automate est compilé une seule fois ici."""
+    global _worker_matcher, _worker_extractor
+    _worker_matcher = KeywordMatcher(keywords, whole_word)
+    _worker_extractor = extractor
+
+
+def _analyze_in_worker(
+    url: str, html: str, track: bool, known_hash: Optional[str], min_words: int = 0
+) -> Tuple[Optional[str], Optional[List[Occurrence]], int]:
+    """
+    Extraction + recherche dans un processus du pool. Renvoie (empreinte du texte,
+    occurrences, nombre de mots) ; occurrences vaut None si l'empreinte est égale à
+    `known_hash`, ou si le texte compte moins de `min_words` mots (page à rendre).
+    """
+    text = html_to_text(html, _worker_extractor)
+    words = len(text.split())
+    if words < min_words:
+        return None, None, words
+    if not track:
+        return None, find_occurrences(text, url, _worker_matcher), words
+    content_hash = StateStore.digest(text)
+    if content_hash == known_hash:
+        return content_hash, None, words
+    return content_hash, find_occurrences(text, url, _worker_matcher), words
+
+
+def make_cpu_pool(workers: int, matcher: KeywordMatcher, extractor: Optional[str] = None) -> ProcessPoolExecutor:
+    """
+    Pool de processus d'analyse. Les processus sont créés à la première tâche, depuis
+    un thread de téléchargement : pas de fork d'un processus multi-thread (verrous
+    urllib3 / logging tenus par un autre thread), on passe par forkserver ou spawn.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    keywords = [kw for kws in matcher.keywords for kw in kws]
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(keywords, matcher.whole_word, extractor),
+    )
+
+
+def _render_or_none(renderer: Renderer, url: str) -> Optional[str]:
+    try:
+        return renderer.render(url)
+    except Exception as e:
+        print(f"[WARN] Rendu headless impossible pour {url}, texte HTTP conservé : {e}", file=sys.stderr)
+        return None
+
+
+def _scrape_one(
+    url: str,
+    matcher: KeywordMatcher,
+    timeout: int,
+    session: Optional[requests.Session] = None,
+    validators: Optional[ValidatorStore] = None,
+    extractor: Optional[str] = None,
+    state: Optional[StateStore] = None,
+    cpu_pool: Optional[ProcessPoolExecutor] = None,
+    policy: Optional[FetchPolicy] = None,
+    renderer: Optional[Renderer] = None,
+) -> Optional[List[Occurrence]]:
+    """
+    Avec `state`, renvoie seulement les écarts par rapport aux occurrences déjà
+    signalées, ou None si la page n'a pas changé depuis le dernier passage (304, ou
+    même texte) ; les validateurs HTTP sont alors gardés dans `state`. Sinon, avec
+    `validators`, un 304 ré-émet les occurrences mémorisées pour la page. Les
+    validateurs ne sont enregistrés qu'une fois la page analysée.
+    Avec `cpu_pool`, le thread appelant ne fait que le téléchargement et attend le
+    résultat du processus. Avec `renderer`, une page au texte presque vide est
+    re-téléchargée via un navigateur.
+    """
+    known_pages = state if state is not None else validators
+    headers = known_pages.headers_for(url) if known_pages is not None else {}
+    html, fresh = fetch_page(url, timeout=timeout, session=session, headers=headers, policy=policy)
+    if html is None:  # 304 : la page a déjà été analysée avec ces mots-clés
+        if state is not None:
+            state.touch(url)
+            return None
+        return validators.stored(url)
+
+    if cpu_pool is not None:
+        track = state is not None
+        known = state.known_hash(url) if state else None
+        min_words = renderer.min_words if renderer else 0
+        content_hash, occs, words = cpu_pool.submit(_analyze_in_worker, url, html, track, known, min_words).result()
+        if renderer is not None and renderer.wants(words):
+            html = _render_or_none(renderer, url) or html
+            content_hash, occs, _ = cpu_pool.submit(_analyze_in_worker, url, html, track, known).result()
+        if state is None:
+            if validators is not None:
+                validators.update(url, fresh, occs)
+            return occs
+        if occs is None:
+            state.touch(url, fresh)
+            return None
+        return state.record(url, content_hash, occs, fresh)
+
+    text = html_to_text(html, extractor)
+    if renderer is not None and renderer.wants(len(text.split())):
+        html = _render_or_none(renderer, url)
+        if html is not None:
+            text = html_to_text(html, extractor)
+    if state is None:
+        occs = find_occurrences(text, url, matcher)
+        if validators is not None:
+            validators.update(url, fresh, occs)
+        return occs
+    content_hash = state.digest(text)
+    if state.is_unchanged(url, content_hash, fresh):
+        return None
+    return state.record(url, content_hash, find_occurrences(text, url, matcher), fresh)
+
+
+def _report(url: str, occs: Optional[List[Occurrence]]) -> Tuple[str, List[Occurrence]]:
+    if occs is None:
+        print(f"[INFO] Inchangé depuis le dernier passage, analyse ignorée : {url}", file=sys.stderr)
+        return url, []
+    return url, occs
+
+
+def _iter_sequential(
+    sites: List[str],
+    matcher: KeywordMatcher,
+    timeout: int,
+    session: requests.Session,
+    validators: Optional[ValidatorStore],
+    extractor: Optional[str],
+    state: Optional[StateStore],
+    cpu_pool: Optional[ProcessPoolExecutor],
+    policy: Optional[FetchPolicy],
+    renderer: Optional[Renderer],
+) -> Iterator[Tuple[str, List[Occurrence]]]:
     for url in sites:
         try:
-            text = fetch_text(url, timeout=timeout)
-            occs = find_occurrences(text, url, keywords)
-            if occs:
-                results[url] = occs
+            yield _report(
+                url,
+                _scrape_one(url, matcher, timeout, session, validators, extractor, state, cpu_pool, policy, renderer),
+            )
         except Exception as e:
             print(f"[WARN] Erreur sur {url}: {e}", file=sys.stderr)
+
+
+def iter_scrape(
+    sites: Union[List[str], Dict[str, List[str]]],
+    keywords: Union[List[str], KeywordMatcher],
+    timeout: int = 15,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    per_host: int = DEFAULT_PER_HOST,
+    session: Optional[requests.Session] = None,
+    validators: Optional[ValidatorStore] = None,
+    whole_word: bool = False,
+    extractor: Optional[str] = None,
+    state: Optional[StateStore] = None,
+    workers: int = 0,
+    policy: Optional[FetchPolicy] = None,
+    renderer: Optional[Renderer] = None,
+) -> Iterator[Tuple[str, List[Occurrence]]]:
+    """
+    Génère (url, occurrences) au fur et à mesure que chaque page est traitée.
+    `sites` est une liste d'URLs ou des URLs déjà regroupées par hôte
+    (SiteRegistry.group_by_host).
+
+    Au plus `concurrency` requêtes sont en vol, dont au plus `per_host` vers un même
+    hôte. Les hôtes sont servis à tour de rôle pour qu'un gros site ne monopolise
+    pas les slots. Avec concurrency <= 1, les sites sont parcourus un par un.
+    Sans `session`, une session keep-alive est créée pour la durée du parcours.
+    L'automate des mots-clés est compilé une seule fois pour tout le parcours.
+    Avec `state`, seules les occurrences nouvelles ou disparues sont produites, et les
+    validateurs HTTP sont gardés dans l'état (`validators` est alors ignoré).
+    Avec `workers` > 0, extraction et recherche passent par un pool de processus.
+    `policy` applique débit par hôte, relances et disjoncteur à chaque requête ;
+    `renderer` rend dans un navigateur les pages au texte presque vide.
+    """
+    matcher = keywords if isinstance(keywords, KeywordMatcher) else KeywordMatcher(keywords, whole_word)
+    per_host = max(1, per_host)
+    pending: Dict[str, deque] = {}
+    if isinstance(sites, dict):
+        pending = {host: deque(urls) for host, urls in sites.items() if urls}
+        sites = [url for urls in sites.values() for url in urls]
+    else:
+        for url in sites:
+            pending.setdefault(host_of(url), deque()).append(url)
+
+    own_session = session is None
+    if own_session:
+        session = make_session(hosts=len(pending), per_host=per_host)
+    cpu_pool = make_cpu_pool(workers, matcher, extractor) if workers > 0 else None
+    try:
+        if concurrency <= 1:
+            yield from _iter_sequential(
+                sites, matcher, timeout, session, validators, extractor, state, cpu_pool, policy, renderer
+            )
+        else:
+            yield from _iter_concurrent(
+                pending, matcher, timeout, concurrency, per_host, session, validators, extractor, state, cpu_pool,
+                policy, renderer,
+            )
+    finally:
+        if cpu_pool is not None:
+            cpu_pool.shutdown(wait=True, cancel_futures=True)
+        if own_session:
+            session.close()
+
+
+def _iter_concurrent(
+    pending: Dict[str, deque],
+    matcher: KeywordMatcher,
+    timeout: int,
+    concurrency: int,
+    per_host: int,
+    session: requests.Session,
+    validators: Optional[ValidatorStore],
+    extractor: Optional[str],
+    state: Optional[StateStore],
+    cpu_pool: Optional[ProcessPoolExecutor],
+    policy: Optional[FetchPolicy],
+    renderer: Optional[Renderer],
+) -> Iterator[Tuple[str, List[Occurrence]]]:
+    active: Dict[str, int] = {}
+    running: Dict[Future, Tuple[str, str]] = {}
+    pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="fetch")
+
+    def dispatch() -> None:
+        progress = True
+        while progress and len(running) < concurrency:
+            progress = False
+            for host in list(pending):
+                if len(running) >= concurrency:
+                    break
+                if active.get(host, 0) >= per_host:
+                    continue
+                queue = pending[host]
+                url = queue.popleft()
+                if not queue:
+                    del pending[host]
+                active[host] = active.get(host, 0) + 1
+                fut = pool.submit(
+                    _scrape_one, url, matcher, timeout, session, validators, extractor, state, cpu_pool, policy,
+                    renderer,
+                )
+                running[fut] = (url, host)
+                progress = True
+
+    try:
+        dispatch()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                url, host = running.pop(fut)
+                active[host] -= 1
+                dispatch()
+                try:
+                    occs = fut.result()
+                except Exception as e:
+                    print(f"[WARN] Erreur sur {url}: {e}", file=sys.stderr)
+                    continue
+                yield _report(url, occs)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def scrape_sites(
+    sites: Union[List[str], Dict[str, List[str]]],
+    keywords: Union[List[str], KeywordMatcher],
+    timeout: int = 15,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    per_host: int = DEFAULT_PER_HOST,
+    validators: Optional[ValidatorStore] = None,
+    whole_word: bool = False,
+    extractor: Optional[str] = None,
+    workers: int = 0,
+    policy: Optional[FetchPolicy] = None,
+    renderer: Optional[Renderer] = None,
+) -> Dict[str, List[Occurrence]]:
+    """Variante qui rassemble tout en mémoire ; préférer `iter_scrape` pour les grandes listes."""
+    results: Dict[str, List[Occurrence]] = {}
+    for url, occs in iter_scrape(
+        sites,
+        keywords,
+        timeout=timeout,
+        concurrency=concurrency,
+        per_host=per_host,
+        validators=validators,
+        whole_word=whole_word,
+        extractor=extractor,
+        workers=workers,
+        policy=policy,
+        renderer=renderer,
+    ):
+        if occs:
+            results[url] = occs
     return results
 
 
+class TextSink:
+    """Affichage lisible, site par site, au fil de l'eau."""
+
+    MARKERS = {"new": "+", "removed": "-"}
+
+    def __init__(self, stream: IO[str]):
+        self.stream = stream
+
+    def write(self, url: str, occs: List[Occurrence]) -> None:
+        lines = [f"\nSite: {url}"]
+        for occ in occs:
+            lines.append(f"  {self.MARKERS.get(occ.change, '-')} Mot-clé: {occ.keyword}")
+            lines.append(f"    Snippet: {occ.snippet}")
+        self.stream.write("\n".join(lines) + "\n")
+        self.stream.flush()
+
+    def close(self) -> None:
+        pass
+
+
+class NdjsonSink:
+    """Une ligne JSON par occurrence, écrite et vidée dès que le site est traité."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._fh = path.open("w", encoding="utf-8")
+
+    def write(self, url: str, occs: List[Occurrence]) -> None:
+        self._fh.write("".join(json.dumps(occ.to_dict(), ensure_ascii=False) + "\n" for occ in occs))
+        self._fh.flush()
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+class JsonSink:
+    """
+    Document JSON {url: [occurrences]} écrit site par site : rien n'est gardé en
+    mémoire, et le fichier n'est complet (donc lisible) qu'à la fermeture.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._fh = path.open("w", encoding="utf-8")
+        self._fh.write("{")
+        self._first = True
+
+    def write(self, url: str, occs: List[Occurrence]) -> None:
+        items = ",".join(
+            "\n    " + json.dumps(occ.to_dict(), ensure_ascii=False) for occ in occs
+        )
+        self._fh.write(
+            ("\n  " if self._first else ",\n  ")
+            + json.dumps(url, ensure_ascii=False)
+            + ": ["
+            + items
+            + "\n  ]"
+        )
+        self._first = False
+        self._fh.flush()
+
+    def close(self) -> None:
+        self._fh.write("\n}\n" if not self._first else "}\n")
+        self._fh.close()
+
+
 def main():
-  parser = argparse.ArgumentParser(description="Bot de recherche d'occurrences sur une liste de sites.")
-  parser.add_argument("--sites", required=True, help="Fichier texte avec une URL par ligne ou un JSON (ex: sites.json)")
-  parser.add_argument("--keywords", help="Liste de mots-clés séparés par des virgules")
-  parser.add_argument("--keywords-file", help="Fichier texte avec un mot-clé par ligne")
-  parser.add_argument("--json-output", help="Chemin du fichier JSON de sortie")
-  parser.add_argument("--timeout", type=int, default=15, help="Timeout HTTP (s)")
-  parser.add_argument("--categories", help="Filtrer les sites.json par catégories (séparées par virgules, insensible à la casse)")
-  args = parser.parse_args()
-
-  categories = set()
-  if args.categories:
-    categories = {c.strip().lower() for c in args.categories.split(",") if c.strip()}
-
-  sites = load_list_from_file(Path(args.sites), categories)
+    parser = argparse.ArgumentParser(description="Bot de recherche d'occurrences sur une liste de sites.")
+    parser.add_argument("--sites", required=True, help="Fichier texte avec une URL par ligne ou un JSON (ex: sites.json)")
+    parser.add_argument("--keywords", help="Liste de mots-clés séparés par des virgules")
+    parser.add_argument("--keywords-file", help="Fichier texte avec un mot-clé par ligne")
+    parser.add_argument("--ndjson-output", help="Fichier NDJSON (une occurrence par ligne, écrit au fil de l'eau)")
+    parser.add_argument("--json-output", help="Chemin du fichier JSON de sortie")
+    parser.add_argument("--timeout", type=int, default=15, help="Timeout HTTP (s)")
+    parser.add_argument("--categories", help="Filtrer les sites.json par catégories (séparées par virgules, insensible à la casse)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Nombre maximal de requêtes HTTP simultanées")
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST, help="Nombre maximal de requêtes simultanées vers un même hôte")
+    parser.add_argument("--sequential", action="store_true", help="Télécharger les sites un par un (mode historique)")
+    parser.add_argument("--whole-word", action="store_true", help="Ne retenir que les occurrences formant des mots entiers")
+    parser.add_argument(
+        "--extractor",
+        choices=sorted(EXTRACTORS),
+        default=DEFAULT_EXTRACTOR,
+        help=f"Backend d'extraction du texte HTML (défaut : {DEFAULT_EXTRACTOR})",
+    )
+    parser.add_argument(
+        "--validators-file",
+        help="Fichier JSON des ETag/Last-Modified et des occurrences trouvées, pour les requêtes conditionnelles "
+        "(sur un 304, les occurrences mémorisées sont ré-émises ; avec --since-last-run, --state-file en tient lieu)",
+    )
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help=f"Requêtes par seconde et par hôte (défaut : {DEFAULT_RATE:g}, 0 = sans limite)")
+    parser.add_argument("--burst", type=int, default=DEFAULT_PER_HOST, help=f"Rafale autorisée par hôte (défaut : {DEFAULT_PER_HOST})")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES, help=f"Relances sur 429/5xx (défaut : {DEFAULT_RETRIES})")
+    parser.add_argument("--breaker-file", help="Fichier JSON du disjoncteur, conservé d'un passage à l'autre")
+    parser.add_argument("--breaker-threshold", type=int, default=3, help="Échecs consécutifs avant d'écarter un hôte (défaut : 3)")
+    parser.add_argument("--breaker-cooldown", type=float, default=3600, help="Durée (s) pendant laquelle un hôte est écarté (défaut : 3600)")
+    parser.add_argument("--render", action="store_true", help="Rendre dans un navigateur headless les pages au texte presque vide (sites full JS)")
+    parser.add_argument("--render-min-words", type=int, default=DEFAULT_RENDER_MIN_WORDS, help=f"Seuil de mots en dessous duquel une page est rendue (défaut : {DEFAULT_RENDER_MIN_WORDS})")
+    parser.add_argument("--render-pool", type=int, default=DEFAULT_RENDER_POOL, help=f"Navigateurs headless pour --render (défaut : {DEFAULT_RENDER_POOL})")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Processus dédiés à l'extraction et à la recherche (0 = dans les threads de téléchargement ; "
+        "garder --concurrency >= --workers)",
+    )
+    parser.add_argument(
+        "--since-last-run",
+        action="store_true",
+        help="N'affiche que les occurrences nouvelles ou disparues depuis le dernier passage (pages inchangées non analysées)",
+    )
+    parser.add_argument(
+        "--state-file",
+        default=DEFAULT_STATE_FILE,
+        help=f"Base SQLite de l'état pour --since-last-run (défaut : {DEFAULT_STATE_FILE})",
+    )
+    args = parser.parse_args()
+
+    categories = set()
+    if args.categories:
+        categories = {c.strip().lower() for c in args.categories.split(",") if c.strip()}
+
+    # Registre compilé (mis en cache) : sites canonisés et déjà regroupés par hôte
+    registry = SiteRegistry.load(Path(args.sites))
+    if categories and not registry.by_category:
+        print(f"--categories : {args.sites} ne contient aucune catégorie (liste texte ou JSON sans colonne CATEGORIES)", file=sys.stderr)
+        sys.exit(1)
+    sites = registry.group_by_host(categories)
+    if categories and not sites:
+        print(f"[WARN] Aucun site pour les catégories demandées (disponibles : {', '.join(registry.categories())})", file=sys.stderr)
     keywords: List[str] = []
     if args.keywords:
         keywords.extend([k.strip() for k in args.keywords.split(",") if k.strip()])
@@ -154,23 +1446,70 @@ def main():
         print("Aucun mot-clé fourni (--keywords ou --keywords-file)", file=sys.stderr)
         sys.exit(1)
 
-    results = scrape_sites(sites, keywords, timeout=args.timeout)
-
-    # Affichage
-    for url, occs in results.items():
-        print(f"\nSite: {url}")
-        for occ in occs:
-            print(f"  - Mot-clé: {occ.keyword}")
-            print(f"    Snippet: {occ.snippet}")
+    concurrency = 1 if args.sequential else args.concurrency
+    matcher = KeywordMatcher(keywords, whole_word=args.whole_word)
+    validators = None
+    if args.validators_file and not args.since_last_run:
+        validators = ValidatorStore(Path(args.validators_file), matcher.fingerprint())
+    breaker = CircuitBreaker(
+        Path(args.breaker_file) if args.breaker_file else None,
+        threshold=args.breaker_threshold,
+        cooldown=args.breaker_cooldown,
+    )
+    policy = FetchPolicy(rate=args.rate, burst=args.burst, retries=args.retries, breaker=breaker)
+    renderer = None
+    if args.render:
+        try:
+            renderer = Renderer(size=args.render_pool, min_words=args.render_min_words, timeout=args.timeout)
+        except RuntimeError as e:
+            print(str(e), file=sys.stderr)
+            sys.exit(1)
+    state = None
+    if args.since_last_run:
+        tracked = [kw for kws in matcher.keywords for kw in kws]
+        state = StateStore(Path(args.state_file), matcher.fingerprint(), tracked)
 
+    # Pipeline en flux : chaque site est écrit dans les sorties dès qu'il est traité,
+    # rien n'est accumulé en mémoire.
+    sinks = [TextSink(sys.stdout)]
+    if args.ndjson_output:
+        sinks.append(NdjsonSink(Path(args.ndjson_output)))
     if args.json_output:
-        out_path = Path(args.json_output)
-        serialized = {
-            url: [occ.__dict__ for occ in occs] for url, occs in results.items()
-        }
-        out_path.write_text(json.dumps(serialized, ensure_ascii=False, indent=2))
-        print(f"\nRésultats écrits dans {out_path}")
+        sinks.append(JsonSink(Path(args.json_output)))
+    try:
+        for url, occs in iter_scrape(
+            sites,
+            matcher,
+            timeout=args.timeout,
+            concurrency=concurrency,
+            per_host=args.per_host,
+            validators=validators,
+            extractor=args.extractor,
+            state=state,
+            workers=args.workers,
+            policy=policy,
+            renderer=renderer,
+        ):
+            if not occs:
+                continue
+            for sink in sinks:
+                sink.write(url, occs)
+    finally:
+        for sink in sinks:
+            sink.close()
+        if validators:
+            validators.save()
+        breaker.save()
+        if renderer:
+            renderer.close()
+            if renderer.rendered:
+                print(f"[INFO] {renderer.rendered} page(s) rendue(s) en headless", file=sys.stderr)
+        if state:
+            state.close()
 
+    for path in (args.ndjson_output, args.json_output):
+        if path:
+            print(f"\nRésultats écrits dans {path}")
 
 if __name__ == "__main__":
     main()
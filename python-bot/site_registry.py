@@ -0,0 +1,219 @@
+"""
+Registre des sites à surveiller, compilé depuis sites.json (ou une liste texte).
+
+La liste est lue une fois puis compilée en un index binaire (marshal) gardé en
+cache : URLs canonisées et dédoublonnées, index par catégorie et regroupement
+par hôte déjà calculés. Le cache est invalidé dès que la date de modification ou
+la taille du fichier source change ; les passages suivants ne relisent pas le JSON.
+
+Le cache est rangé dans $XDG_CACHE_HOME/keyword_bot (~/.cache/keyword_bot par défaut),
+un fichier par liste source.
+"""
+import hashlib
+import json
+import marshal
+import os
+import re
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+FORMAT_VERSION = 1
+DEFAULT_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "keyword_bot"
+
+# Colonnes reconnues dans sites.json (les exports du tableur n'ont pas tous les mêmes en-têtes)
+URL_FIELDS = ("URL", "Lien Officiel (URL)")
+CATEGORY_FIELDS = ("CATEGORIES", "Column1")
+NAME_FIELDS = ("NAME", "Nom de la Source / Média")
+
+_URL_RE = re.compile(r"https?://[^\s()<>\"']+", re.IGNORECASE)
+# Domaine saisi sans schéma ("dentons.com/en/...") : on suppose https
+_BARE_DOMAIN_RE = re.compile(r"^(?:[a-z0-9-]+\.)+[a-z]{2,}(?::\d+)?(?:/\S*)?$", re.IGNORECASE)
+_CATEGORY_SEPARATORS = re.compile(r"[,;/|]")
+
+# (url, hôte, nom, catégories)
+Entry = Tuple[str, str, str, Tuple[str, ...]]
+
+
+def canonical_url(raw: str) -> Optional[str]:
+    """
+    Première URL http(s) trouvée dans la cellule ("https://x.fr/ (site mentionné)"),
+    ou domaine sans schéma en début de cellule ; schéma et hôte en minuscules, port
+    par défaut et fragment retirés, chemin vide remplacé par "/". None si la cellule
+    ne contient pas d'URL.
+    """
+    match = _URL_RE.search(raw or "")
+    if match:
+        candidate = match.group(0)
+    else:
+        tokens = (raw or "").split()
+        if not tokens or not _BARE_DOMAIN_RE.match(tokens[0]):
+            return None
+        candidate = "https://" + tokens[0]
+    try:
+        parts = urlsplit(candidate.rstrip(".,;:"))
+        host = (parts.hostname or "").lower()
+        port = parts.port
+    except ValueError:
+        return None
+    if not host:
+        return None
+    scheme = parts.scheme.lower()
+    netloc = host
+    if port and not (scheme == "http" and port == 80 or scheme == "https" and port == 443):
+        netloc = f"{host}:{port}"
+    return urlunsplit((scheme, netloc, parts.path or "/", parts.query, ""))
+
+
+def normalize_category(value: str) -> str:
+    folded = unicodedata.normalize("NFD", value or "").encode("ascii", "ignore").decode()
+    return " ".join(folded.lower().split())
+
+
+def _first(item: Dict, fields: Iterable[str]) -> str:
+    for field in fields:
+        value = item.get(field)
+        if value:
+            return str(value)
+    return ""
+
+
+def _parse_source(path: Path) -> List[Entry]:
+    """Entrées du fichier source, dans l'ordre, dédoublonnées sur l'URL canonique."""
+    entries: List[Entry] = []
+    seen: Dict[str, int] = {}
+
+    def add(raw_url: str, name: str = "", categories: Tuple[str, ...] = ()) -> None:
+        url = canonical_url(raw_url)
+        if url is None:
+            return
+        if url in seen:
+            # Même site listé deux fois : on fusionne les catégories
+            index = seen[url]
+            old = entries[index]
+            merged = old[3] + tuple(c for c in categories if c not in old[3])
+            entries[index] = (old[0], old[1], old[2], merged)
+            return
+        seen[url] = len(entries)
+        entries.append((url, urlsplit(url).hostname or "", name, categories))
+
+    if path.suffix.lower() == ".json":
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except Exception as e:
+            raise ValueError(f"Impossible de lire le JSON {path}: {e}")
+        for item in data:
+            if not isinstance(item, dict):
+                continue
+            categories = tuple(
+                dict.fromkeys(
+                    c for c in map(normalize_category, _CATEGORY_SEPARATORS.split(_first(item, CATEGORY_FIELDS))) if c
+                )
+            )
+            add(_first(item, URL_FIELDS), _first(item, NAME_FIELDS).strip(), categories)
+    else:
+        for line in path.read_text(encoding="utf-8").splitlines():
+            add(line.strip())
+    return entries
+
+
+class SiteRegistry:
+    """Liste de sites compilée : URLs canoniques, index par catégorie et par hôte."""
+
+    def __init__(self, entries: List[Entry], by_category: Dict[str, List[int]], by_host: Dict[str, List[int]]):
+        self.entries = entries
+        self.by_category = by_category
+        self.by_host = by_host
+
+    @classmethod
+    def compile(cls, entries: List[Entry]) -> "SiteRegistry":
+        by_category: Dict[str, List[int]] = {}
+        by_host: Dict[str, List[int]] = {}
+        for index, (_, host, _, categories) in enumerate(entries):
+            by_host.setdefault(host, []).append(index)
+            for category in categories:
+                by_category.setdefault(category, []).append(index)
+        return cls(entries, by_category, by_host)
+
+    @classmethod
+    def load(cls, path: Path, cache_dir: Optional[Path] = DEFAULT_CACHE_DIR) -> "SiteRegistry":
+        """
+        Registre de `path`, depuis le cache s'il correspond encore au fichier source,
+        sinon compilé puis mis en cache. `cache_dir=None` désactive le cache.
+        """
+        if not path.exists():
+            raise FileNotFoundError(f"Fichier introuvable : {path}")
+        stat = path.stat()
+        signature = [FORMAT_VERSION, marshal.version, str(path.resolve()), stat.st_mtime_ns, stat.st_size]
+        cache_file = None
+        if cache_dir is not None:
+            digest = hashlib.sha1(str(path.resolve()).encode("utf-8")).hexdigest()[:16]
+            cache_file = Path(cache_dir) / f"{path.stem}-{digest}.sites"
+            registry = cls._read_cache(cache_file, signature)
+            if registry is not None:
+                return registry
+
+        registry = cls.compile(_parse_source(path))
+        if cache_file is not None:
+            registry._write_cache(cache_file, signature)
+        return registry
+
+    @classmethod
+    def _read_cache(cls, cache_file: Path, signature: List) -> Optional["SiteRegistry"]:
+        try:
+            data = marshal.loads(cache_file.read_bytes())
+            if data["signature"] != signature:
+                return None
+            return cls(data["entries"], data["by_category"], data["by_host"])
+        except (OSError, EOFError, ValueError, TypeError, KeyError):
+            return None
+
+    def _write_cache(self, cache_file: Path, signature: List) -> None:
+        payload = marshal.dumps({
+            "signature": signature,
+            "entries": self.entries,
+            "by_category": self.by_category,
+            "by_host": self.by_host,
+        })
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+            tmp.write_bytes(payload)
+            os.replace(tmp, cache_file)
+        except OSError:
+            pass  # cache en lecture seule : on recompilera au prochain passage
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def categories(self) -> List[str]:
+        return sorted(self.by_category)
+
+    def select(self, categories: Optional[Iterable[str]] = None) -> List[int]:
+        """
+        Indices des sites dont une catégorie contient l'un des termes demandés
+        (insensible à la casse et aux accents), dans l'ordre du fichier. Sans
+        catégorie demandée, tous les sites.
+        """
+        wanted = {normalize_category(c) for c in categories or () if c and c.strip()}
+        if not wanted:
+            return list(range(len(self.entries)))
+        selected = set()
+        for category, indices in self.by_category.items():
+            if any(term in category for term in wanted):
+                selected.update(indices)
+        return sorted(selected)
+
+    def urls(self, categories: Optional[Iterable[str]] = None) -> List[str]:
+        return [self.entries[i][0] for i in self.select(categories)]
+
+    def group_by_host(self, categories: Optional[Iterable[str]] = None) -> Dict[str, List[str]]:
+        """URLs regroupées par hôte (ordre de première apparition), prêtes pour l'ordonnanceur."""
+        if not categories:
+            return {host: [self.entries[i][0] for i in indices] for host, indices in self.by_host.items()}
+        groups: Dict[str, List[str]] = {}
+        for i in self.select(categories):
+            url, host, _, _ = self.entries[i]
+            groups.setdefault(host, []).append(url)
+        return groups